@@ -1,5 +1,9 @@
 import datetime
+import json
+import os
 import random
+import tempfile
+import time
 import unittest
 
 from genetic_algorithms.utils import genetic
@@ -21,22 +25,153 @@ class GuessPasswordTests(unittest.TestCase):
         target = "".join(random.choice(self.gene_set) for _ in range(length))
         self.guess_password(target)
 
+    def test_islands(self):
+        target = "For I am fearfully and wonderfully made."
+        self.guess_password(target, islands=4)
+
+    def test_islands_failure(self):
+        target = "For I am fearfully and wonderfully made."
+        calls = 0
+
+        def fn_get_fitness(genes):
+            nonlocal calls
+            calls += 1
+            if calls > 30:
+                raise ValueError("fitness failed")
+            return get_fitness(genes, target)
+
+        with self.assertRaises(RuntimeError):
+            genetic.get_best(
+                fn_get_fitness, len(target), len(target), self.gene_set,
+                lambda candidate: None, islands=2
+            )
+
+    def test_islands_max_seconds(self):
+        target = "For I am fearfully and wonderfully made."
+
+        def fn_get_fitness(genes):
+            time.sleep(0.2)
+            return get_fitness(genes, target)
+
+        best = genetic.get_best(
+            fn_get_fitness, len(target), len(target), self.gene_set,
+            lambda candidate: None, islands=2, max_seconds=0.05
+        )
+        self.assertEqual(best.StopReason, genetic.StopReasons.MaxSeconds)
+
+    def test_islands_stats(self):
+        target = "Hello World!"
+        with self.assertRaises(ValueError):
+            genetic.get_best(
+                lambda genes: get_fitness(genes, target), len(target),
+                len(target), self.gene_set, lambda candidate: None, islands=2,
+                stats=genetic.EngineStats()
+            )
+
+    def test_delta(self):
+        target = "For I am fearfully and wonderfully made."
+        self.guess_password(target, incremental=True)
+
+    def test_delta_custom_mutate(self):
+        target = "For I am fearfully and wonderfully made."
+
+        def fn_get_fitness(genes):
+            return get_fitness(genes, target)
+
+        def fn_get_fitness_delta(parent, changed_indexes, genes):
+            return get_fitness_delta(parent, changed_indexes, genes, target)
+
+        def fn_mutate(genes):
+            genes[random.randrange(len(genes))] = random.choice(self.gene_set)
+
+        best = genetic.get_best(
+            fn_get_fitness, len(target), len(target), self.gene_set,
+            lambda candidate: None, custom_mutate=fn_mutate,
+            get_fitness_delta=fn_get_fitness_delta
+        )
+        self.assertEqual("".join(best.Genes), target)
+        self.assertIs(type(best.Genes), list)
+
+    def test_delta_deduplicate(self):
+        target = "Hello World!"
+
+        def fn_get_fitness_delta(parent, changed_indexes, genes):
+            return get_fitness_delta(parent, changed_indexes, genes, target)
+
+        with self.assertRaises(ValueError):
+            genetic.get_best(
+                lambda genes: get_fitness(genes, target), len(target),
+                len(target), self.gene_set, lambda candidate: None,
+                get_fitness_delta=fn_get_fitness_delta, deduplicate=True
+            )
+
+    def test_display_rate(self):
+        length = 150
+        target = "".join(random.choice(self.gene_set) for _ in range(length))
+        self.guess_password(target, display_rate=20)
+
+    def test_in_place(self):
+        length = 150
+        target = "".join(random.choice(self.gene_set) for _ in range(length))
+        self.guess_password(target, in_place=True)
+
     def test_benchmark(self):
         genetic.Benchmark.run(self.test_Random)
 
-    def guess_password(self, target):
+    def test_benchmark_parallel(self):
+        result = genetic.Benchmark.run(
+            self.test_hello_world, iterations=8, processes=4, seed=1
+        )
+        self.assertEqual(len(result["timings"]), 8)
+
+    def test_benchmark_baseline(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output_path = os.path.join(directory, "benchmarks.json")
+            result = genetic.Benchmark.run(
+                self.test_hello_world, iterations=5, name="hello",
+                output_path=output_path
+            )
+            self.assertTrue(result["median"] <= result["p90"] <= result["p99"])
+            genetic.Benchmark.save(dict(result, name="other"), output_path)
+            with open(output_path) as infile:
+                self.assertEqual(sorted(json.load(infile)), ["hello", "other"])
+            # a run no slower than its own baseline passes
+            genetic.Benchmark.compare(result, output_path, 0)
+
+            baseline_path = os.path.join(directory, "baseline.json")
+            genetic.Benchmark.save(dict(result, median=1e-9), baseline_path)
+            with self.assertRaises(AssertionError):
+                genetic.Benchmark.run(
+                    self.test_hello_world, iterations=5, name="hello",
+                    baseline_path=baseline_path, regression_threshold=0.1
+                )
+
+    def guess_password(
+        self,
+        target,
+        islands=None,
+        incremental=False,
+        display_rate=None,
+        in_place=False,
+    ):
         start_time = datetime.datetime.now()
 
         def fn_get_fitness(genes):
             return get_fitness(genes, target)
 
+        def fn_get_fitness_delta(parent, changed_indexes, genes):
+            return get_fitness_delta(parent, changed_indexes, genes, target)
+
         def fn_display(candidate):
             display(candidate, start_time)
 
         optimal_fitness = len(target)
         best = genetic.get_best(
             fn_get_fitness, len(target), optimal_fitness,
-            self.gene_set, fn_display
+            self.gene_set, fn_display, islands=islands,
+            get_fitness_delta=fn_get_fitness_delta if incremental else None,
+            display_rate=display_rate,
+            mutate_in_place=in_place
         )
         self.assertEqual("".join(best.Genes), target)
 
@@ -54,5 +189,14 @@ def get_fitness(genes, target):
     return sum(1 for expected, actual in zip(target, genes) if expected == actual)
 
 
+def get_fitness_delta(parent, changed_indexes, genes, target):
+    fitness = parent.Fitness
+    for index in changed_indexes:
+        fitness += (genes[index] == target[index]) - (
+            parent.Genes[index] == target[index]
+        )
+    return fitness
+
+
 if __name__ == "__main__":
     unittest.main()
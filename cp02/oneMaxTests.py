@@ -1,11 +1,24 @@
+import asyncio
 import datetime
+import os
+import pickle
+import random
+import tempfile
 import unittest
 
 from genetic_algorithms.utils import genetic
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 
 class OneMaxTests(unittest.TestCase):
-    def test(self, length=100):
+    def test_compact_genes(self):
+        self.test(compact_genes=True)
+
+    def test(self, length=100, compact_genes=False):
         gene_set = [0, 1]
         start_time = datetime.datetime.now()
 
@@ -17,14 +30,297 @@ class OneMaxTests(unittest.TestCase):
 
         optimal_fitness = length
         best = genetic.get_best(
-            fn_get_fitness, length, optimal_fitness, gene_set, fn_display
+            fn_get_fitness,
+            length,
+            optimal_fitness,
+            gene_set,
+            fn_display,
+            compact_genes=compact_genes,
+        )
+        self.assertEqual(best.Fitness, optimal_fitness)
+
+    def test_fitness_cache(self):
+        calls = []
+
+        def fn_get_fitness(genes):
+            calls.append(genes)
+            return get_fitness(genes)
+
+        cache = genetic.FitnessCache(fn_get_fitness, max_size=2)
+        cache([0, 1])
+        cache([0, 1])
+        cache([1, 1])
+        # evicts [0, 1], the least recently used
+        cache([0, 0])
+        cache([0, 1])
+        self.assertEqual(len(calls), 4)
+        self.assertEqual((cache.Hits, cache.Misses, len(cache)), (1, 4, 2))
+
+        stats = genetic.EngineStats()
+        genetic.get_best(
+            get_fitness,
+            16,
+            16,
+            [0, 1],
+            lambda candidate: None,
+            fitness_cache_size=100,
+            stats=stats,
+            seed=1,
+        )
+        snapshot = stats.snapshot()
+        self.assertTrue(snapshot["cache_hits"] > 0)
+        self.assertEqual(snapshot["cache_misses"], snapshot["evaluations"])
+
+    def test_batch(self, length=100):
+        gene_set = [0, 1]
+        start_time = datetime.datetime.now()
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        def fn_get_fitness_batch(population):
+            return [get_fitness(genes) for genes in population]
+
+        optimal_fitness = length
+        best = genetic.get_best(
+            None,
+            length,
+            optimal_fitness,
+            gene_set,
+            fn_display,
+            get_fitness_batch=fn_get_fitness_batch,
+            batch_size=20,
+        )
+        self.assertEqual(best.Fitness, optimal_fitness)
+
+    @unittest.skipIf(numpy is None, "requires numpy")
+    def test_vectorized(self, length=1000):
+        gene_set = [0, 1]
+        start_time = datetime.datetime.now()
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        def fn_get_fitness_vectorized(population):
+            return population.sum(axis=1)
+
+        optimal_fitness = length
+        best = genetic.get_best(
+            None,
+            length,
+            optimal_fitness,
+            gene_set,
+            fn_display,
+            get_fitness_vectorized=fn_get_fitness_vectorized,
+        )
+        self.assertEqual(best.Fitness, optimal_fitness)
+
+    def test_async(self, length=100):
+        gene_set = [0, 1]
+        start_time = datetime.datetime.now()
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        async def fn_get_fitness(genes):
+            await asyncio.sleep(0.001)
+            return get_fitness(genes)
+
+        optimal_fitness = length
+        best = asyncio.run(
+            genetic.get_best_async(
+                fn_get_fitness,
+                length,
+                optimal_fitness,
+                gene_set,
+                fn_display,
+                max_in_flight=20,
+            )
         )
         self.assertEqual(best.Fitness, optimal_fitness)
+        self.assertEqual(best.StopReason, genetic.StopReasons.Optimal)
+
+    def test_async_max_seconds(self, length=1000):
+        gene_set = [0, 1]
+
+        async def fn_get_fitness(genes):
+            await asyncio.sleep(0.001)
+            return get_fitness(genes)
+
+        best = asyncio.run(
+            genetic.get_best_async(
+                fn_get_fitness,
+                length,
+                length,
+                gene_set,
+                lambda candidate: None,
+                max_seconds=0.3,
+            )
+        )
+        self.assertEqual(best.StopReason, genetic.StopReasons.MaxSeconds)
+
+    def test_checkpoint(self, length=100):
+        gene_set = [0, 1]
+        start_time = datetime.datetime.now()
+        interrupt_fitness = length - 10
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        def fn_display_then_interrupt(candidate):
+            fn_display(candidate)
+            if candidate.Fitness >= interrupt_fitness:
+                raise Interrupted()
+
+        optimal_fitness = length
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint.pickle")
+            with self.assertRaises(Interrupted):
+                genetic.get_best(
+                    get_fitness,
+                    length,
+                    optimal_fitness,
+                    gene_set,
+                    fn_display_then_interrupt,
+                    checkpoint_path=checkpoint_path,
+                    checkpoint_interval=0,
+                )
+            self.assertTrue(os.path.exists(checkpoint_path))
+
+            improvements = []
+
+            def fn_display_resumed(candidate):
+                improvements.append(candidate.Fitness)
+                fn_display(candidate)
+
+            best = genetic.get_best(
+                get_fitness,
+                length,
+                optimal_fitness,
+                gene_set,
+                fn_display_resumed,
+                checkpoint_path=checkpoint_path,
+                checkpoint_interval=0,
+            )
+            self.assertTrue(improvements[0] >= interrupt_fitness - 1)
+            self.assertEqual(best.Fitness, optimal_fitness)
+            self.assertFalse(os.path.exists(checkpoint_path))
+
+    def test_max_evaluations(self, length=100):
+        start_time = datetime.datetime.now()
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        best = genetic.get_best(
+            get_fitness,
+            length,
+            length + 1,
+            [0, 1],
+            fn_display,
+            max_evaluations=50,
+        )
+        self.assertEqual(best.StopReason, genetic.StopReasons.MaxEvaluations)
+
+    def test_stagnation(self, length=100):
+        start_time = datetime.datetime.now()
+
+        def fn_display(candidate):
+            display(candidate, start_time)
+
+        best = genetic.get_best(
+            get_fitness,
+            length,
+            length + 1,
+            [0, 1],
+            fn_display,
+            max_generations_without_improvement=1000,
+        )
+        self.assertEqual(best.StopReason, genetic.StopReasons.Stagnation)
+        self.assertEqual(best.Fitness, length)
+
+    def test_checkpoint_module_random(self, length=100):
+        states = []
+
+        def fn_mutate(genes):
+            states.append(random.getstate())
+            index = random.randrange(len(genes))
+            genes[index] = 1 - genes[index]
+
+        def fn_interrupt(candidate):
+            if candidate.Fitness >= length - 10:
+                raise Interrupted()
+
+        with tempfile.TemporaryDirectory() as directory:
+            checkpoint_path = os.path.join(directory, "checkpoint.pickle")
+            with self.assertRaises(Interrupted):
+                genetic.get_best(
+                    get_fitness,
+                    length,
+                    length,
+                    [0, 1],
+                    fn_interrupt,
+                    custom_mutate=fn_mutate,
+                    checkpoint_path=checkpoint_path,
+                    checkpoint_interval=0,
+                )
+            with open(checkpoint_path, "rb") as infile:
+                saved_state = pickle.load(infile)[-1]
+            states.clear()
+            genetic.get_best(
+                get_fitness,
+                length,
+                length,
+                [0, 1],
+                lambda candidate: None,
+                custom_mutate=fn_mutate,
+                checkpoint_path=checkpoint_path,
+                checkpoint_interval=0,
+            )
+            # custom operators continue from where they stopped
+            self.assertEqual(states[0], saved_state)
+
+    def test_improvements(self, length=100):
+        events = []
+        for improvement in genetic.get_improvements(get_fitness, length, [0, 1]):
+            events.append(improvement)
+            if improvement.Chromosome.Fitness >= length - 10:
+                break
+        evaluations = [event.Evaluations for event in events]
+        self.assertEqual(evaluations, sorted(evaluations))
+        self.assertEqual(events[0].Strategy, genetic.Strategies.Create)
+        self.assertTrue(events[-1].Elapsed >= events[0].Elapsed)
+
+    def test_improvements_async(self, length=100):
+        async def fn_get_fitness(genes):
+            return get_fitness(genes)
+
+        async def collect():
+            events = []
+            improvements = genetic.get_improvements_async(
+                fn_get_fitness, length, [0, 1]
+            )
+            async for improvement in improvements:
+                events.append(improvement)
+                if improvement.Chromosome.Fitness >= length - 10:
+                    break
+            await improvements.aclose()
+            return events
+
+        events = asyncio.run(collect())
+        evaluations = [event.Evaluations for event in events]
+        self.assertEqual(evaluations, sorted(evaluations))
+        self.assertEqual(events[0].Strategy, genetic.Strategies.Create)
+        self.assertTrue(events[-1].Elapsed >= events[0].Elapsed)
 
     def test_benchmark(self):
         genetic.Benchmark.run(lambda: self.test(4000))
 
 
+class Interrupted(Exception):
+    pass
+
+
 def get_fitness(genes):
     return genes.count(1)
 
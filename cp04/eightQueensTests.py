@@ -5,7 +5,29 @@ from genetic_algorithms.utils import genetic
 
 
 class EightQueensTests(unittest.TestCase):
+    def test_stats(self):
+        stats = genetic.EngineStats()
+        self.solve(stats=stats)
+        snapshot = stats.snapshot()
+        self.assertTrue(snapshot["fitness_seconds"] > 0)
+        self.assertTrue(snapshot["children"]["Mutate"] > 0)
+        self.assertTrue(snapshot["accepted"] <= sum(snapshot["children"].values()))
+        self.assertTrue(snapshot["improvements"] >= 1)
+        self.assertTrue(snapshot["evaluations"] > snapshot["improvements"])
+        # the clock stops with the run
+        self.assertEqual(
+            stats.snapshot()["elapsed_seconds"], snapshot["elapsed_seconds"]
+        )
+
+    def test_seed(self):
+        first = self.solve(seed=42)
+        second = self.solve(seed=42)
+        self.assertEqual(list(first.Genes), list(second.Genes))
+
     def test(self, size=8):
+        self.solve(size)
+
+    def solve(self, size=8, stats=None, seed=None):
         gene_set = [i for i in range(size)]
         start_time = datetime.datetime.now()
 
@@ -17,9 +39,11 @@ class EightQueensTests(unittest.TestCase):
 
         optimal_fitness = Fitness(0)
         best = genetic.get_best(
-            fn_get_fitness, 2 * size, optimal_fitness, gene_set, fn_display
+            fn_get_fitness, 2 * size, optimal_fitness, gene_set, fn_display,
+            stats=stats, seed=seed
         )
         self.assertTrue(not optimal_fitness > best.Fitness)
+        return best
 
     def test_benchmark(self):
         genetic.Benchmark.run(lambda: self.test(20))
@@ -45,9 +69,11 @@ class Board:
 
 class Fitness:
     Total = None
+    SortKey = None
 
     def __init__(self, total):
         self.Total = total
+        self.SortKey = -total
 
     def __gt__(self, other):
         return self.Total < other.Total
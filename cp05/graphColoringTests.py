@@ -13,10 +13,28 @@ class GraphColoringTests(unittest.TestCase):
             "R100_1gb.col", ["Red", "Orange", "Yellow", "Green", "Blue", "Indigo"]
         )
 
+    def test_threads(self):
+        stats = genetic.EngineStats()
+        self.color(
+            "adjacent_states.col",
+            ["Orange", "Yellow", "Green", "Blue"],
+            max_workers=4,
+            stats=stats,
+        )
+        parallel_efficiency = stats.snapshot()["parallel_efficiency"]
+        self.assertTrue(0 < parallel_efficiency <= 1)
+
+    def test_threads_fitness_cache(self):
+        with self.assertRaises(ValueError):
+            genetic.get_best(
+                lambda genes: 0, 10, 1, ["R", "G"], lambda candidate: None,
+                max_workers=4, fitness_cache_size=100
+            )
+
     def test_benchmark(self):
         genetic.Benchmark.run(lambda: self.test_R100_1gb())
 
-    def color(self, file, colors):
+    def color(self, file, colors, max_workers=None, stats=None):
         rules, nodes = load_data(file)
         optimal_value = len(rules)
         color_lookup = {color[0]: color for color in colors}
@@ -31,7 +49,13 @@ class GraphColoringTests(unittest.TestCase):
             return get_fitness(genes, rules, node_index_lookup)
 
         best = genetic.get_best(
-            fn_get_fitness, len(nodes), optimal_value, gene_set, fn_display
+            fn_get_fitness,
+            len(nodes),
+            optimal_value,
+            gene_set,
+            fn_display,
+            stats=stats,
+            max_workers=max_workers,
         )
         self.assertTrue(not optimal_value > best.Fitness)
 
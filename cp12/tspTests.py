@@ -45,12 +45,51 @@ class TravelingSalesmanTests(unittest.TestCase):
         optimal_sequence = ["A", "B", "C", "D", "E", "F", "G", "H"]
         self.solve(id_to_location_lookup, optimal_sequence)
 
+    def test_ulysses16_adaptive(self):
+        id_to_location_lookup = load_data("ulysses16.tsp")
+        optimal_sequence = [14, 13, 12, 16, 1, 3, 2, 4, 8, 15, 5, 11, 9, 10, 7, 6]
+        strategy_selector = genetic.AdaptiveStrategySelector()
+        stats = genetic.EngineStats()
+        self.solve(
+            id_to_location_lookup, optimal_sequence, strategy_selector, stats=stats
+        )
+        snapshot = strategy_selector.snapshot()
+        self.assertEqual(sorted(snapshot), ["Crossover", "Mutate"])
+        # every child is credited to the strategy that made it
+        self.assertEqual(
+            sum(strategy_selector.Children.values()),
+            sum(stats.snapshot()["children"].values()),
+        )
+
+    def test_ulysses16_deduplicate(self):
+        id_to_location_lookup = load_data("ulysses16.tsp")
+        optimal_sequence = [14, 13, 12, 16, 1, 3, 2, 4, 8, 15, 5, 11, 9, 10, 7, 6]
+        stats = genetic.EngineStats()
+        self.solve(
+            id_to_location_lookup,
+            optimal_sequence,
+            deduplicate=True,
+            stats=stats,
+            seed=1,
+        )
+        snapshot = stats.snapshot()
+        self.assertTrue(snapshot["duplicates_skipped"] > 0)
+        self.assertTrue(0 < snapshot["pool_diversity"] <= 1)
+
     def test_ulysses16(self):
         id_to_location_lookup = load_data("ulysses16.tsp")
         optimal_sequence = [14, 13, 12, 16, 1, 3, 2, 4, 8, 15, 5, 11, 9, 10, 7, 6]
         self.solve(id_to_location_lookup, optimal_sequence)
 
-    def solve(self, id_to_location_lookup, optimal_sequence):
+    def solve(
+        self,
+        id_to_location_lookup,
+        optimal_sequence,
+        strategy_selector=None,
+        deduplicate=False,
+        stats=None,
+        seed=None,
+    ):
         gene_set = [i for i in id_to_location_lookup.keys()]
 
         def fn_create():
@@ -79,8 +118,12 @@ class TravelingSalesmanTests(unittest.TestCase):
             fn_mutate,
             fn_create,
             max_age=500,
-            poolSize=25,
+            pool_size=25,
             crossover=fn_crossover,
+            strategy_selector=strategy_selector,
+            deduplicate=deduplicate,
+            stats=stats,
+            seed=seed,
         )
         self.assertTrue(not optimal_fitness > best.Fitness)
 
@@ -164,9 +207,11 @@ def get_fitness(genes, id_to_location_lookup):
 
 class Fitness:
     TotalDistance = None
+    SortKey = None
 
     def __init__(self, total_distance):
         self.TotalDistance = total_distance
+        self.SortKey = -total_distance
 
     def __gt__(self, other):
         return self.TotalDistance < other.TotalDistance
@@ -293,7 +293,7 @@ class LawnmowerTests(unittest.TestCase):
             fn_mutate,
             fn_create,
             max_age=None,
-            poolSize=10,
+            pool_size=10,
             crossover=crossover,
         )
 
@@ -455,6 +455,7 @@ class Fitness:
         self.TotalMowed = total_mowed
         self.TotalInstructions = total_instructions
         self.StepCount = step_count
+        self.SortKey = (total_mowed, -step_count, -total_instructions)
 
     def __gt__(self, other):
         if self.TotalMowed != other.TotalMowed:
@@ -1,6 +1,7 @@
 import datetime
 import random
 import unittest
+from functools import partial
 
 import circuits
 
@@ -40,6 +41,15 @@ def create_gene(index, gates, sources):
     return Node(gate_type[0], index_a, index_b)
 
 
+def create_not(input_a, _input_b):
+    return circuits.Not(input_a)
+
+
+def create_source(label, _input_a, _input_b):
+    # looked up on each call so genes stay picklable
+    return circuits.Source(label, CircuitTests.inputs)
+
+
 def mutate(child_genes, fn_create_gene, fn_get_fitness, source_count):
     count = random.randint(1, 5)
     initial_fitness = fn_get_fitness(child_genes)
@@ -62,11 +72,11 @@ class CircuitTests(unittest.TestCase):
         cls.inputs = dict()
         cls.gates = [
             [circuits.And, circuits.And],
-            [lambda i1, i2: circuits.Not(i1), circuits.Not],
+            [create_not, circuits.Not],
         ]
         cls.sources = [
-            [lambda i1, i2: circuits.Source("A", cls.inputs), circuits.Source],
-            [lambda i1, i2: circuits.Source("B", cls.inputs), circuits.Source],
+            [partial(create_source, "A"), circuits.Source],
+            [partial(create_source, "B"), circuits.Source],
         ]
 
     def test_generate_OR(self):
@@ -80,6 +90,31 @@ class CircuitTests(unittest.TestCase):
         optimal_length = 6
         self.find_circuit(rules, optimal_length)
 
+    def test_generate_OR_parallel(self):
+        rules = [
+            [[False, False], False],
+            [[False, True], True],
+            [[True, False], True],
+            [[True, True], True],
+        ]
+        self.find_circuit(rules, 6, processes=4)
+
+    def test_hill_climbing_unpicklable_result(self):
+        def fn_optimize(value):
+            # a closure can't be sent back from the attempt's process
+            return value if value == 0 else lambda: value
+
+        with self.assertRaises(RuntimeError):
+            genetic.hill_climbing(
+                fn_optimize,
+                lambda best, child: True,
+                lambda best: False,
+                lambda best: 1,
+                lambda best, value: None,
+                0,
+                processes=2,
+            )
+
     def test_generate_XOR(self):
         rules = [
             [[False, False], False],
@@ -100,9 +135,7 @@ class CircuitTests(unittest.TestCase):
             [[True, True, False], False],
             [[True, True, True], True],
         ]
-        self.sources.append(
-            [lambda l, r: circuits.Source("C", self.inputs), circuits.Source]
-        )
+        self.sources.append([partial(create_source, "C"), circuits.Source])
         self.gates.append([circuits.Or, circuits.Or])
         self.find_circuit(rules, 12)
 
@@ -128,12 +161,8 @@ class CircuitTests(unittest.TestCase):
         bit_n_rules = [[rule[0], rule[1][2 - bit]] for rule in rules]
         self.gates.append([circuits.Or, circuits.Or])
         self.gates.append([circuits.Xor, circuits.Xor])
-        self.sources.append(
-            [lambda l, r: circuits.Source("C", self.inputs), circuits.Source]
-        )
-        self.sources.append(
-            [lambda l, r: circuits.Source("D", self.inputs), circuits.Source]
-        )
+        self.sources.append([partial(create_source, "C"), circuits.Source])
+        self.sources.append([partial(create_source, "D"), circuits.Source])
         return bit_n_rules
 
     def test_2_bit_adder_1s_bit(self):
@@ -148,7 +177,7 @@ class CircuitTests(unittest.TestCase):
         rules = self.get_2_bit_adder_rules_for_bit(2)
         self.find_circuit(rules, 9)
 
-    def find_circuit(self, rules, expected_length):
+    def find_circuit(self, rules, expected_length, processes=None):
         start_time = datetime.datetime.now()
 
         def fn_display(candidate, length=None):
@@ -159,8 +188,9 @@ class CircuitTests(unittest.TestCase):
                 )
             display(candidate, start_time)
 
-        def fn_get_fitness(genes):
-            return get_fitness(genes, rules, self.inputs)
+        fn_get_fitness = genetic.FitnessCache(
+            lambda genes: get_fitness(genes, rules, self.inputs)
+        )
 
         def fn_create_gene(index):
             return create_gene(index, self.gates, self.sources)
@@ -184,7 +214,7 @@ class CircuitTests(unittest.TestCase):
                 fn_display,
                 fn_mutate,
                 fn_create,
-                poolSize=3,
+                pool_size=3,
                 max_seconds=30,
             )
 
@@ -209,6 +239,7 @@ class CircuitTests(unittest.TestCase):
             fn_get_next_feature_value,
             fn_display,
             max_length,
+            processes=processes,
         )
         self.assertTrue(best.Fitness == len(rules))
         self.assertFalse(len(nodes_to_circuit(best.Genes)[1]) > expected_length)
@@ -221,26 +221,43 @@ def mutate_add_wanted(genes, wanted):
     return True
 
 
-def mutate(genes, fn_get_fitness, mutation_operators, mutation_round_counts):
-    initial_fitness = fn_get_fitness(genes)
-    count = random.choice(mutation_round_counts)
-    for i in range(1, count + 2):
-        copy = mutation_operators[:]
-        func = random.choice(copy)
-        while not func(genes):
-            copy.remove(func)
-            func = random.choice(copy)
-        if fn_get_fitness(genes) > initial_fitness:
-            mutation_round_counts.append(i)
-            return
-
-
 class RegexTests(unittest.TestCase):
     def test_two_digits(self):
         wanted = {"01", "11", "10"}
         unwanted = {"00", ""}
         self.find_regex(wanted, unwanted, 7)
 
+    def test_operator_stats(self):
+        wanted = {"01", "11", "10"}
+        unwanted = {"00", ""}
+        stats = genetic.EngineStats()
+        self.find_regex(wanted, unwanted, 7, stats=stats)
+        operators = stats.snapshot()["operators"]
+        self.assertTrue(sum(x["trials"] for x in operators.values()) > 0)
+
+    def test_scheduler_skips_inapplicable_operator(self):
+        calls = []
+
+        def mutate_never(genes):
+            calls.append(1)
+            return False
+
+        def mutate_increase(genes):
+            genes[random.randrange(len(genes))] += 1
+            return True
+
+        fn_mutate = genetic.MutationScheduler(
+            [mutate_never, mutate_increase], sum, rng=random.Random(1)
+        )
+        for _ in range(400):
+            fn_mutate([0] * 10)
+        operators = fn_mutate.snapshot()["operators"]
+        self.assertEqual(operators["mutate_never"]["trials"], len(calls))
+        self.assertTrue(
+            operators["mutate_never"]["recent_rate"]
+            < operators["mutate_increase"]["recent_rate"]
+        )
+
     def test_grouping(self):
         wanted = {"01", "0101", "010101"}
         unwanted = {"0011", ""}
@@ -365,7 +382,9 @@ class RegexTests(unittest.TestCase):
         ]
         self.find_regex(wanted, unwanted, 120, custom_operators)
 
-    def find_regex(self, wanted, unwanted, expected_length, custom_operators=None):
+    def find_regex(
+        self, wanted, unwanted, expected_length, custom_operators=None, stats=None
+    ):
         start_time = datetime.datetime.now()
         text_genes = wanted | set(c for w in wanted for c in w)
         full_gene_set = [i for i in allMetas | text_genes]
@@ -376,8 +395,6 @@ class RegexTests(unittest.TestCase):
         def fn_get_fitness(genes):
             return get_fitness(genes, wanted, unwanted)
 
-        mutation_round_counts = [1]
-
         mutation_operators = [
             partial(mutate_add, gene_set=full_gene_set),
             partial(mutate_replace, gene_set=full_gene_set),
@@ -388,8 +405,9 @@ class RegexTests(unittest.TestCase):
         if custom_operators is not None:
             mutation_operators.extend(custom_operators)
 
-        def fn_mutate(genes):
-            mutate(genes, fn_get_fitness, mutation_operators, mutation_round_counts)
+        fn_mutate = genetic.MutationScheduler(
+            mutation_operators, fn_get_fitness, stats=stats
+        )
 
         optimal_fitness = Fitness(len(wanted), len(wanted), 0, expected_length)
 
@@ -400,7 +418,8 @@ class RegexTests(unittest.TestCase):
             full_gene_set,
             fn_display,
             fn_mutate,
-            poolSize=10,
+            pool_size=10,
+            stats=stats,
         )
         self.assertTrue(not optimal_fitness > best.Fitness)
 
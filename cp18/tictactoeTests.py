@@ -216,20 +216,6 @@ def mutate_move(genes):
     return True
 
 
-def mutate(genes, fn_get_fitness, mutation_operators, mutation_round_counts):
-    initial_fitness = fn_get_fitness(genes)
-    count = random.choice(mutation_round_counts)
-    for i in range(1, count + 2):
-        copy = mutation_operators[:]
-        func = random.choice(copy)
-        while not func(genes):
-            copy.remove(func)
-            func = random.choice(copy)
-        if fn_get_fitness(genes) > initial_fitness:
-            mutation_round_counts.append(i)
-            return
-
-
 def create_gene_set():
     options = [[ContentType.Opponent, [0, 1, 2]], [ContentType.Mine, [0, 1, 2]]]
     gene_set = [
@@ -281,10 +267,7 @@ class TicTacToeTests(unittest.TestCase):
         def fn_display(candidate):
             display(candidate, start_time)
 
-        def fn_get_fitness(genes):
-            return get_fitness(genes)
-
-        mutation_round_counts = [1]
+        fn_get_fitness = genetic.FitnessCache(get_fitness)
 
         mutation_operators = [
             partial(mutate_add, gene_set=gene_set),
@@ -294,8 +277,7 @@ class TicTacToeTests(unittest.TestCase):
             mutate_move,
         ]
 
-        def fn_mutate(genes):
-            mutate(genes, fn_get_fitness, mutation_operators, mutation_round_counts)
+        fn_mutate = genetic.MutationScheduler(mutation_operators, fn_get_fitness)
 
         def fn_crossover(parent, donor):
             child = parent[0: int(len(parent) / 2)] + donor[int(len(donor) / 2):]
@@ -320,8 +302,57 @@ class TicTacToeTests(unittest.TestCase):
         )
         self.assertTrue(not optimal_fitness > best.Fitness)
 
+    def test_tournament(self):
+        self.tournament(13)
+
+    def test_tournament_parallel(self):
+        serial = self.tournament(4, max_generations=2, seed=7)
+        parallel = self.tournament(4, max_generations=2, seed=7, processes=4)
+        self.assertEqual(
+            [str(rule) for rule in serial], [str(rule) for rule in parallel]
+        )
+
+    def test_tournament_match_cache(self):
+        match_cache = genetic.MatchCache()
+        uncached = self.tournament(4, max_generations=3, seed=5)
+        cached = self.tournament(
+            4, max_generations=3, seed=5, match_cache=match_cache
+        )
+        self.assertEqual(
+            [str(rule) for rule in uncached], [str(rule) for rule in cached]
+        )
+        self.assertTrue(match_cache.Hits > 0)
+        self.assertTrue(0 < match_cache.hit_rate() <= 1)
+
+    def test_tournament_swiss(self):
+        self.tournament(15, max_generations=3, pairing=genetic.swiss_pairing(5))
+
+    def test_tournament_random_opponents(self):
+        self.tournament(15, max_generations=3, pairing=genetic.random_pairing(5))
+
+    def test_tournament_odd_pool(self):
+        # 1 + 4 * 4 players, so someone sits out every round
+        self.tournament(4, max_generations=3, pairing=genetic.swiss_pairing(5))
+        standings = list(range(101))
+        for pairing in [genetic.swiss_pairing(5), genetic.random_pairing(5)]:
+            games = [0] * 101
+            for pairs in pairing(101, standings.__getitem__, random.Random(1)):
+                for i, j in pairs:
+                    games[i] += 1
+                    games[j] += 1
+            # the bye rotates, nobody sits out twice
+            self.assertEqual(games.count(8), 5)
+            self.assertEqual(games.count(10), 96)
+
     @staticmethod
-    def test_tournament():
+    def tournament(
+        num_parents,
+        max_generations=100,
+        seed=None,
+        processes=None,
+        match_cache=None,
+        pairing=genetic.round_robin_pairing,
+    ):
         min_genes = 10
         max_genes = 20
         gene_set = create_gene_set()
@@ -336,8 +367,6 @@ class TicTacToeTests(unittest.TestCase):
                 start_time,
             )
 
-        mutation_round_counts = [1]
-
         mutation_operators = [
             partial(mutate_add, gene_set=gene_set),
             partial(mutate_replace, gene_set=gene_set),
@@ -346,8 +375,7 @@ class TicTacToeTests(unittest.TestCase):
             mutate_move,
         ]
 
-        def fn_mutate(genes):
-            mutate(genes, lambda x: 0, mutation_operators, mutation_round_counts)
+        fn_mutate = genetic.MutationScheduler(mutation_operators, lambda x: 0)
 
         def fn_crossover(parent, donor):
             child = parent[0: int(len(parent) / 2)] + donor[int(len(donor) / 2):]
@@ -360,8 +388,19 @@ class TicTacToeTests(unittest.TestCase):
         def fn_sort_key(genes, _, ties, losses):
             return -1000 * losses - ties + 1 / len(genes)
 
-        genetic.tournament(
-            fn_create, fn_crossover, play1on1, fn_display, fn_sort_key, 13)
+        return genetic.tournament(
+            fn_create,
+            fn_crossover,
+            play1on1,
+            fn_display,
+            fn_sort_key,
+            num_parents,
+            max_generations,
+            seed,
+            processes,
+            match_cache,
+            pairing,
+        )
 
 
 class ContentType:
@@ -739,6 +778,11 @@ class Fitness:
         self.PercentWins = percent_wins
         self.PercentLosses = percent_losses
         self.GeneCount = gene_count
+        if losses > 0:
+            # with losses only the loss rate is compared
+            self.SortKey = (-percent_losses, False)
+        else:
+            self.SortKey = (-percent_losses, True, -ties, -gene_count)
 
     def __gt__(self, other):
         if self.PercentLosses != other.PercentLosses:
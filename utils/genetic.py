@@ -1,41 +1,179 @@
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import pickle
+import queue
 import random
 import statistics
 import sys
+import threading
 import time
+import traceback
+from array import array, typecodes
 from bisect import bisect_left
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, IntEnum
+from functools import partial
 from math import exp
 
+# 'u' is deprecated in favour of 'w' where the latter is available
+_CHAR_TYPECODE = "w" if "w" in typecodes else "u"
 
-def _generate_parent(length, gene_set, get_fitness):
+# set by Benchmark.run while it times a function
+_evaluation_counter = None
+
+# (players, compete) shared with forked tournament workers
+_tournament_matches = None
+
+# the function timed by forked Benchmark.run workers
+_benchmark_function = None
+
+
+def _count_evaluations(function, counter, get_count=None):
+    if function is None:
+        return None
+
+    def fn_counted(*args):
+        counter.Evaluations += 1 if get_count is None else get_count(*args)
+        return function(*args)
+
+    return fn_counted
+
+
+def _time_evaluations(function, stats, get_count=None):
+    if function is None:
+        return None
+
+    def fn_timed(*args):
+        start_time = time.perf_counter()
+        result = function(*args)
+        stats.FitnessSeconds += time.perf_counter() - start_time
+        stats.Evaluations += 1 if get_count is None else get_count(*args)
+        return result
+
+    return fn_timed
+
+
+def _time_operator(function, stats, attribute):
+    # fitness time spent inside the operator is reported separately
+    def fn_timed(*args):
+        start_time = time.perf_counter()
+        fitness_seconds = stats.FitnessSeconds
+        result = function(*args)
+        seconds = time.perf_counter() - start_time
+        seconds -= stats.FitnessSeconds - fitness_seconds
+        setattr(stats, attribute, getattr(stats, attribute) + seconds)
+        return result
+
+    return fn_timed
+
+
+def _create_threaded_batch(get_fitness, executor, worker_count, stats):
+    def fn_timed(genes):
+        start_time = time.perf_counter()
+        fitness = get_fitness(genes)
+        return fitness, time.perf_counter() - start_time
+
+    def fn_get_fitness_batch(population):
+        start_time = time.perf_counter()
+        results = list(executor.map(fn_timed, population))
+        if stats is not None:
+            stats.ParallelWorkers = worker_count
+            stats.ParallelWallSeconds += time.perf_counter() - start_time
+            stats.ParallelWorkSeconds += sum(seconds for _, seconds in results)
+        return [fitness for fitness, _ in results]
+
+    return fn_get_fitness_batch
+
+
+def _get_gene_typecode(gene_set):
+    if all(isinstance(gene, str) and len(gene) == 1 for gene in gene_set):
+        return _CHAR_TYPECODE
+    if not all(type(gene) is int for gene in gene_set):
+        return None
+    low, high = min(gene_set), max(gene_set)
+    for typecode in "bhilq":
+        limit = 1 << (8 * array(typecode).itemsize - 1)
+        if -limit <= low and high < limit:
+            return typecode
+    return None
+
+
+def _get_random(seed):
+    # seed can be anything random.seed accepts or a random.Random to share
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(random.getrandbits(64) if seed is None else seed)
+
+
+def _spawn_seeds(rng, count):
+    # large distinct seeds give practically independent Mersenne Twister streams
+    return [rng.getrandbits(128) for _ in range(count)]
+
+
+def _generate_parent(length, gene_set, get_fitness, rng, typecode=None):
     genes = []
     while len(genes) < length:
         sample_size = min(length - len(genes), len(gene_set))
-        genes.extend(random.sample(gene_set, sample_size))
+        genes.extend(rng.sample(gene_set, sample_size))
+    if typecode is not None:
+        genes = array(typecode, genes)
     fitness = get_fitness(genes)
     return Chromosome(genes, fitness, Strategies.Create)
 
 
-def _mutate(parent, gene_set, get_fitness):
+def _mutate(parent, gene_set, get_fitness, rng, get_fitness_delta=None):
     child_genes = parent.Genes[:]
-    index = random.randrange(0, len(parent.Genes))
-    new_gene, alternate = random.sample(gene_set, 2)
+    index = rng.randrange(0, len(parent.Genes))
+    new_gene, alternate = rng.sample(gene_set, 2)
     child_genes[index] = alternate if new_gene == child_genes[index] else new_gene
-    fitness = get_fitness(child_genes)
+    if get_fitness_delta is None:
+        fitness = get_fitness(child_genes)
+    else:
+        fitness = get_fitness_delta(parent, [index], child_genes)
     return Chromosome(child_genes, fitness, Strategies.Mutate)
 
 
-def _mutate_custom(parent, custom_mutate, get_fitness):
-    child_genes = parent.Genes[:]
+def _mutate_in_place(parent, gene_set, get_fitness, rng):
+    genes = parent.Genes
+    index = rng.randrange(0, len(genes))
+    new_gene, alternate = rng.sample(gene_set, 2)
+    old_gene = genes[index]
+    gene = alternate if new_gene == old_gene else new_gene
+    genes[index] = gene
+    try:
+        fitness = get_fitness(genes)
+    finally:
+        # the child's own genes are only built if it is kept
+        genes[index] = old_gene
+    return _PendingChromosome(parent, [(index, gene)], fitness, Strategies.Mutate)
+
+
+def _mutate_custom(parent, custom_mutate, get_fitness, get_fitness_delta=None):
+    if get_fitness_delta is None:
+        child_genes = parent.Genes[:]
+        custom_mutate(child_genes)
+        fitness = get_fitness(child_genes)
+        return Chromosome(child_genes, fitness, Strategies.Mutate)
+    child_genes = _ChangeTrackingGenes(parent.Genes)
     custom_mutate(child_genes)
-    fitness = get_fitness(child_genes)
-    return Chromosome(child_genes, fitness, Strategies.Mutate)
+    if child_genes.ChangedIndexes is None:
+        fitness = get_fitness(child_genes)
+    else:
+        fitness = get_fitness_delta(
+            parent, sorted(child_genes.ChangedIndexes), child_genes
+        )
+    # a plain list, so later mutations don't pay for the tracking
+    return Chromosome(list(child_genes), fitness, Strategies.Mutate)
 
 
 def _crossover(
-    parent_genes, index, parents, get_fitness, crossover, mutate, generate_parent
+    parent_genes, index, parents, get_fitness, crossover, mutate, generate_parent, rng
 ):
-    donor_index = random.randrange(0, len(parents))
+    donor_index = rng.randrange(0, len(parents))
     if donor_index == index:
         donor_index = (donor_index + 1) % len(parents)
     child_genes = crossover(parent_genes, parents[donor_index].Genes)
@@ -47,90 +185,516 @@ def _crossover(
     return Chromosome(child_genes, fitness, Strategies.Crossover)
 
 
-def _get_improvement(new_child, generate_parent, max_age, pool_size, max_seconds):
+def _defer_fitness(_):
+    return None
+
+
+def _get_sort_key(fitness):
+    # fitness types may provide a precomputed key that orders like __gt__
+    return getattr(fitness, "SortKey", fitness)
+
+
+def _evaluate_batch(children, get_fitness_batch):
+    pending = [child for _, child in children if child.Fitness is None]
+    if len(pending) == 0:
+        return
+    fitnesses = get_fitness_batch([child.Genes for child in pending])
+    for child, fitness in zip(pending, fitnesses):
+        child.Fitness = fitness
+        child.SortKey = _get_sort_key(fitness)
+
+
+def _accept_child(
+    parents, index, child, best_parent, historical_fitnesses, max_age, rng, stats
+):
+    # applies the age and annealing rules, True when child is a new best
+    parent = parents[index]
+    if stats is not None:
+        stats.Children[child.Strategy] += 1
+    if parent.SortKey > child.SortKey:
+        if max_age is None:
+            return False
+        parent.Age += 1
+        if max_age > parent.Age:
+            return False
+        if stats is not None:
+            stats.Annealed += 1
+        position = bisect_left(
+            historical_fitnesses, child.SortKey, 0, len(historical_fitnesses)
+        )
+        difference = len(historical_fitnesses) - position
+        proportion_similar = difference / len(historical_fitnesses)
+        if rng.random() < exp(-proportion_similar):
+            if child.Genes is None:
+                child.materialize()
+            parents[index] = child
+            if stats is not None:
+                stats.Accepted += 1
+            return False
+        parents[index] = best_parent
+        parent.Age = 0
+        return False
+    if child.Genes is None:
+        child.materialize()
+    if stats is not None:
+        stats.Accepted += 1
+    if not child.SortKey > parent.SortKey:
+        # same fitness
+        child.Age = parent.Age + 1
+        parents[index] = child
+        return False
+    parents[index] = child
+    parent.Age = 0
+    if child.SortKey > best_parent.SortKey:
+        if stats is not None:
+            stats.Improvements += 1
+        return True
+    return False
+
+
+def _get_improvement(
+    new_child,
+    generate_parent,
+    rng,
+    max_age,
+    pool_size,
+    max_seconds,
+    get_fitness_batch=None,
+    batch_size=1,
+    stats=None,
+    checkpoint=None,
+    counter=None,
+    max_evaluations=None,
+    max_stagnant_children=None,
+    strategy_selector=None,
+    deduplicate=False,
+):
+    start_time = time.perf_counter()
+    state = None if checkpoint is None else checkpoint.load()
+    if state is None:
+        best_parent = generate_parent()
+        timed_out = (
+            max_seconds is not None and time.perf_counter() - start_time > max_seconds
+        )
+        yield StopReasons.MaxSeconds if timed_out else None, best_parent
+        parents = [best_parent]
+        historical_fitnesses = [best_parent.SortKey]
+        for _ in range(pool_size - 1):
+            parent = generate_parent()
+            if (
+                max_seconds is not None
+                and time.perf_counter() - start_time > max_seconds
+            ):
+                yield StopReasons.MaxSeconds, parent
+            if parent.SortKey > best_parent.SortKey:
+                yield None, parent
+                best_parent = parent
+                historical_fitnesses.append(parent.SortKey)
+            parents.append(parent)
+        p_index = 1
+    else:
+        (
+            parents,
+            best_parent,
+            historical_fitnesses,
+            p_index,
+            random_state,
+            module_random_state,
+        ) = state
+        rng.setstate(random_state)
+        # custom operators draw from the module-level random
+        random.setstate(module_random_state)
+        yield None, best_parent
+    last_parent_index = len(parents) - 1
+    genome_index = _GenomeIndex(parents, stats) if deduplicate else None
+    iterations = next_clock_check = 0
+    clock_interval = 1
+    stagnant_children = 0
+    while True:
+        if max_seconds is not None and iterations >= next_clock_check:
+            elapsed = time.perf_counter() - start_time
+            if elapsed > max_seconds:
+                yield StopReasons.MaxSeconds, best_parent
+            # read the clock again after roughly 10ms worth of iterations,
+            # growing the interval gradually in case early iterations were fast
+            clock_interval = max(
+                1, min(2 * clock_interval, int(iterations / max(elapsed, 1e-9) / 100))
+            )
+            next_clock_check = iterations + clock_interval
+        if max_evaluations is not None and counter.Evaluations >= max_evaluations:
+            yield StopReasons.MaxEvaluations, best_parent
+        if (
+            max_stagnant_children is not None
+            and stagnant_children >= max_stagnant_children
+        ):
+            yield StopReasons.Stagnation, best_parent
+        iterations += 1
+        if checkpoint is not None and checkpoint.is_due():
+            checkpoint.save(
+                (
+                    parents,
+                    best_parent,
+                    historical_fitnesses,
+                    p_index,
+                    rng.getstate(),
+                    random.getstate(),
+                )
+            )
+        children = []
+        for _ in range(batch_size):
+            p_index = p_index - 1 if p_index > 0 else last_parent_index
+            children.append((p_index, new_child(parents[p_index], p_index, parents)))
+        if genome_index is not None:
+            # crossover may have replaced a donor
+            genome_index.sync(parents)
+            unique = genome_index.filter(children)
+            stagnant_children += len(children) - len(unique)
+            children = unique
+        if get_fitness_batch is not None:
+            _evaluate_batch(children, get_fitness_batch)
+        for index, child in children:
+            if strategy_selector is not None:
+                strategy_selector.credit(
+                    child.Strategy, child.SortKey > parents[index].SortKey
+                )
+            if _accept_child(
+                parents,
+                index,
+                child,
+                best_parent,
+                historical_fitnesses,
+                max_age,
+                rng,
+                stats,
+            ):
+                yield None, child
+                best_parent = child
+                historical_fitnesses.append(child.SortKey)
+                stagnant_children = 0
+            else:
+                stagnant_children += 1
+            if genome_index is not None and parents[index] is not child:
+                genome_index.reject(child)
+        if genome_index is not None:
+            genome_index.sync(parents)
+
+
+def _get_improvement_vectorized(
+    get_fitness_vectorized,
+    length,
+    gene_set,
+    rng,
+    max_age,
+    pool_size,
+    max_seconds,
+    children_per_parent,
+    stats=None,
+):
+    # optional dependency, only needed by this engine
+    import numpy
+
     start_time = time.time()
-    best_parent = generate_parent()
+    numpy_rng = numpy.random.default_rng(rng.getrandbits(64))
+    gene_values = numpy.array(list(gene_set))
+    gene_count = len(gene_values)
+    slots = numpy.arange(pool_size)
+
+    # like _generate_parent each block of gene_count genes has no repeats
+    blocks = -(-length // gene_count)
+    gene_indexes = numpy_rng.random((pool_size, blocks, gene_count)).argsort(axis=2)
+    parents = gene_values[gene_indexes.reshape(pool_size, -1)[:, :length]]
+    fitnesses = numpy.asarray(get_fitness_vectorized(parents))
+    ages = numpy.zeros(pool_size, dtype=numpy.int64)
+    best_index = fitnesses.argmax()
+    best_genes = parents[best_index].copy()
+    best_fitness = fitnesses[best_index]
+    historical_fitnesses = numpy.array([best_fitness])
+    timed_out = max_seconds is not None and time.time() - start_time > max_seconds
     yield (
-        max_seconds is not None and time.time() - start_time > max_seconds, best_parent
+        StopReasons.MaxSeconds if timed_out else None,
+        Chromosome(best_genes.tolist(), best_fitness.item(), Strategies.Create),
     )
-    parents = [best_parent]
-    historical_fitnesses = [best_parent.Fitness]
-    for _ in range(pool_size - 1):
-        parent = generate_parent()
-        if max_seconds is not None and time.time() - start_time > max_seconds:
-            yield True, parent
-        if parent.Fitness > best_parent.Fitness:
-            yield False, parent
-            best_parent = parent
-            historical_fitnesses.append(parent.Fitness)
-        parents.append(parent)
-    last_parent_index = pool_size - 1
-    p_index = 1
+
+    child_count = pool_size * children_per_parent
+    children_rows = numpy.arange(child_count)
     while True:
         if max_seconds is not None and time.time() - start_time > max_seconds:
-            yield True, best_parent
-        p_index = p_index - 1 if p_index > 0 else last_parent_index
-        parent = parents[p_index]
-        child = new_child(parent, p_index, parents)
-        if parent.Fitness > child.Fitness:
-            if max_age is None:
-                continue
-            parent.Age += 1
-            if max_age > parent.Age:
-                continue
-            index = bisect_left(
-                historical_fitnesses, child.Fitness, 0, len(historical_fitnesses)
+            yield StopReasons.MaxSeconds, Chromosome(
+                best_genes.tolist(), best_fitness.item(), Strategies.Mutate
             )
-            difference = len(historical_fitnesses) - index
-            proportion_similar = difference / len(historical_fitnesses)
-            if random.random() < exp(-proportion_similar):
-                parents[p_index] = child
-                continue
-            parents[p_index] = best_parent
-            parent.Age = 0
-            continue
-        if not child.Fitness > parent.Fitness:
-            # same fitness
-            child.Age = parent.Age + 1
-            parents[p_index] = child
-            continue
-        parents[p_index] = child
-        parent.Age = 0
-        if child.Fitness > best_parent.Fitness:
-            yield False, child
-            best_parent = child
-            historical_fitnesses.append(child.Fitness)
 
+        # vectorized _mutate: replace one gene with a different value
+        mutate_start_time = time.perf_counter()
+        children = parents[numpy.repeat(slots, children_per_parent)]
+        indexes = numpy_rng.integers(0, length, child_count)
+        new_genes = numpy_rng.integers(0, gene_count, child_count)
+        offsets = numpy_rng.integers(1, gene_count, child_count)
+        alternates = (new_genes + offsets) % gene_count
+        children[children_rows, indexes] = numpy.where(
+            gene_values[new_genes] == children[children_rows, indexes],
+            gene_values[alternates],
+            gene_values[new_genes],
+        )
+        if stats is not None:
+            stats.MutateSeconds += time.perf_counter() - mutate_start_time
+            stats.Children[Strategies.Mutate] += child_count
+        child_fitnesses = numpy.asarray(get_fitness_vectorized(children))
+        if children_per_parent > 1:
+            # each parent competes with its best child
+            chosen = slots * children_per_parent + child_fitnesses.reshape(
+                pool_size, children_per_parent
+            ).argmax(axis=1)
+            children = children[chosen]
+            child_fitnesses = child_fitnesses[chosen]
 
-def get_best(
-    get_fitness,
-    target_len,
-    optimal_fitness,
-    gene_set,
-    display,
-    custom_mutate=None,
-    custom_create=None,
-    max_age=None,
-    pool_size=1,
-    crossover=None,
-    max_seconds=None,
+        worse = fitnesses > child_fitnesses
+        replaced = ~worse
+        ages[replaced] = numpy.where(
+            child_fitnesses[replaced] > fitnesses[replaced], 0, ages[replaced] + 1
+        )
+        if max_age is not None:
+            ages[worse] += 1
+            expired = worse & (ages >= max_age)
+            if expired.any():
+                if stats is not None:
+                    stats.Annealed += int(expired.sum())
+                positions = numpy.searchsorted(
+                    historical_fitnesses, child_fitnesses[expired]
+                )
+                proportion_similar = (
+                    len(historical_fitnesses) - positions
+                ) / len(historical_fitnesses)
+                accepted = numpy_rng.random(len(positions)) < numpy.exp(
+                    -proportion_similar
+                )
+                expired_slots = slots[expired]
+                replaced[expired_slots[accepted]] = True
+                rejected = expired_slots[~accepted]
+                parents[rejected] = best_genes
+                fitnesses[rejected] = best_fitness
+                ages[expired_slots] = 0
+        parents[replaced] = children[replaced]
+        fitnesses[replaced] = child_fitnesses[replaced]
+        if stats is not None:
+            stats.Accepted += int(replaced.sum())
+
+        best_index = child_fitnesses.argmax()
+        if replaced[best_index] and child_fitnesses[best_index] > best_fitness:
+            best_genes = children[best_index].copy()
+            best_fitness = child_fitnesses[best_index]
+            historical_fitnesses = numpy.append(historical_fitnesses, best_fitness)
+            if stats is not None:
+                stats.Improvements += 1
+            yield None, Chromosome(
+                best_genes.tolist(), best_fitness.item(), Strategies.Mutate
+            )
+
+
+def _get_improvement_events(improvements, counter):
+    start_time = time.perf_counter()
+    for stop_reason, chromosome in improvements:
+        chromosome.StopReason = stop_reason
+        yield Improvement(
+            chromosome, time.perf_counter() - start_time, counter.Evaluations
+        )
+        if stop_reason is not None:
+            return
+
+
+def ring_topology(index, island_count):
+    return [(index + 1) % island_count]
+
+
+def fully_connected_topology(index, island_count):
+    return [i for i in range(island_count) if i != index]
+
+
+def _run_island(
+    index,
+    seed,
+    rng,
+    inboxes,
+    improvements,
+    new_child,
+    generate_parent,
+    max_age,
+    pool_size,
+    max_seconds,
+    get_fitness_batch,
+    batch_size,
+    migration_interval,
+    neighbours,
+    counter,
+    strategy_selector,
 ):
-    random.seed()
+    # forked workers inherit the parent's random state, which the caller's
+    # closures share with this process, so reseed it in place
+    rng.seed(seed)
+    random.seed(rng.getrandbits(64))
+    best_parent = None
+    emigrant = None
+    child_count = 0
 
-    if custom_mutate is None:
+    def fn_new_child(parent, p_index, parents):
+        nonlocal child_count, emigrant
+        child_count += 1
+        if child_count % migration_interval != 0:
+            return new_child(parent, p_index, parents)
+        if emigrant is not best_parent:
+            emigrant = best_parent
+            for neighbour in neighbours:
+                inboxes[neighbour].put(emigrant)
+        immigrant = None
+        while True:
+            try:
+                candidate = inboxes[index].get_nowait()
+            except queue.Empty:
+                break
+            if immigrant is None or candidate.SortKey > immigrant.SortKey:
+                immigrant = candidate
+        if immigrant is None:
+            return new_child(parent, p_index, parents)
+        immigrant.Age = 0
+        return immigrant
 
-        def fn_mutate(parent):
-            return _mutate(parent, gene_set, get_fitness)
+    try:
+        for stop_reason, improvement in _get_improvement(
+            fn_new_child,
+            generate_parent,
+            rng,
+            max_age,
+            pool_size,
+            max_seconds,
+            get_fitness_batch,
+            batch_size,
+            strategy_selector=strategy_selector,
+        ):
+            # the first parent is sent even if time has already run out
+            best_parent = improvement
+            improvements.put((index, improvement, counter.Evaluations))
+            if stop_reason is not None:
+                break
+    except Exception:
+        # the traceback is sent as text since the exception may not pickle
+        error = RuntimeError(
+            "island {} failed:\n{}".format(index, traceback.format_exc())
+        )
+        improvements.put((index, error, counter.Evaluations))
+        return
+    improvements.put((index, None, counter.Evaluations))
 
-    else:
 
-        def fn_mutate(parent):
-            return _mutate_custom(parent, custom_mutate, get_fitness)
+def _get_from_workers(results, workers, timeout=None):
+    # polls so a worker that dies without reporting can't block the caller,
+    # returns None once every worker has exited and nothing is left to read
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        wait = 1.0
+        if deadline is not None:
+            wait = min(wait, deadline - time.time())
+            if wait <= 0:
+                raise queue.Empty
+        exited = all(worker.exitcode is not None for worker in workers)
+        try:
+            return results.get(timeout=wait)
+        except queue.Empty:
+            if exited:
+                return None
+
+
+def _get_improvement_islands(
+    new_child,
+    generate_parent,
+    rng,
+    max_age,
+    pool_size,
+    max_seconds,
+    get_fitness_batch,
+    batch_size,
+    island_count,
+    migration_interval,
+    topology,
+    counter,
+    strategy_selector,
+):
+    # fork so the workers can share the caller's closures without pickling them
+    context = multiprocessing.get_context("fork")
+    improvements = context.Queue()
+    inboxes = [context.Queue() for _ in range(island_count)]
+    seeds = _spawn_seeds(rng, island_count)
+    workers = [
+        context.Process(
+            target=_run_island,
+            args=(
+                index,
+                seeds[index],
+                rng,
+                inboxes,
+                improvements,
+                new_child,
+                generate_parent,
+                max_age,
+                pool_size,
+                max_seconds,
+                get_fitness_batch,
+                batch_size,
+                migration_interval,
+                topology(index, island_count),
+                counter,
+                strategy_selector,
+            ),
+            daemon=True,
+        )
+        for index in range(island_count)
+    ]
+    start_time = time.time()
+    for worker in workers:
+        worker.start()
+    best = None
+    running = island_count
+    evaluations = [0] * island_count
+    try:
+        while running > 0:
+            timeout = None
+            if max_seconds is not None and best is not None:
+                # every island reports at least its first parent
+                timeout = max_seconds - (time.time() - start_time)
+                if timeout <= 0:
+                    break
+            try:
+                message = _get_from_workers(improvements, workers, timeout)
+            except queue.Empty:
+                break
+            if message is None:
+                raise RuntimeError("an island exited without reporting")
+            index, improvement, evaluations[index] = message
+            counter.Evaluations = sum(evaluations)
+            if improvement is None:
+                running -= 1
+                continue
+            if isinstance(improvement, Exception):
+                raise improvement
+            if best is not None and not improvement.SortKey > best.SortKey:
+                continue
+            best = improvement
+            yield None, best
+        if best is not None:
+            # the islands only stop on their own when they run out of time
+            yield StopReasons.MaxSeconds, best
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+
 
+def _create_generate_parent(
+    target_len, gene_set, custom_create, get_fitness, rng, typecode
+):
     if custom_create is None:
 
         def fn_generate_parent():
-            return _generate_parent(target_len, gene_set, get_fitness)
+            return _generate_parent(target_len, gene_set, get_fitness, rng, typecode)
 
     else:
 
@@ -138,34 +702,619 @@ def get_best(
             genes = custom_create()
             return Chromosome(genes, get_fitness(genes), Strategies.Create)
 
+    return fn_generate_parent
+
+
+def _create_new_child(
+    gene_set,
+    custom_mutate,
+    crossover,
+    get_child_fitness,
+    get_fitness_delta,
+    generate_parent,
+    rng,
+    stats,
+    strategy_selector=None,
+    mutate_in_place=False,
+):
+    if mutate_in_place:
+
+        def fn_mutate(parent):
+            return _mutate_in_place(parent, gene_set, get_child_fitness, rng)
+
+    elif custom_mutate is None:
+
+        def fn_mutate(parent):
+            return _mutate(
+                parent, gene_set, get_child_fitness, rng, get_fitness_delta
+            )
+
+    else:
+
+        def fn_mutate(parent):
+            return _mutate_custom(
+                parent, custom_mutate, get_child_fitness, get_fitness_delta
+            )
+
     strategy_lookup = {
-        Strategies.Create: lambda p, i, o: fn_generate_parent(),
+        Strategies.Create: lambda p, i, o: generate_parent(),
         Strategies.Mutate: lambda p, i, o: fn_mutate(p),
         Strategies.Crossover: lambda p, i, o: _crossover(
-            p.Genes, i, o, get_fitness, crossover, fn_mutate, fn_generate_parent
+            p.Genes,
+            i,
+            o,
+            get_child_fitness,
+            crossover,
+            fn_mutate,
+            generate_parent,
+            rng,
         ),
     }
+    if stats is not None:
+        strategy_lookup[Strategies.Mutate] = _time_operator(
+            strategy_lookup[Strategies.Mutate], stats, "MutateSeconds"
+        )
+        strategy_lookup[Strategies.Crossover] = _time_operator(
+            strategy_lookup[Strategies.Crossover], stats, "CrossoverSeconds"
+        )
 
     used_strategies = [strategy_lookup[Strategies.Mutate]]
-    if crossover is not None:
+    if crossover is not None and strategy_selector is not None:
+        strategies = [Strategies.Mutate, Strategies.Crossover]
+
+        def fn_new_child(parent, index, parents):
+            strategy = strategy_selector.choose(strategies, rng)
+            start_time = time.perf_counter()
+            child = strategy_lookup[strategy](parent, index, parents)
+            strategy_selector.charge(strategy, time.perf_counter() - start_time)
+            return child
+
+    elif crossover is not None:
         used_strategies.append(strategy_lookup[Strategies.Crossover])
 
         def fn_new_child(parent, index, parents):
-            return random.choice(used_strategies)(parent, index, parents)
+            return rng.choice(used_strategies)(parent, index, parents)
 
-    else:
+    elif stats is None:
 
         def fn_new_child(parent, _, __):
             return fn_mutate(parent)
 
-    for timedOut, improvement in _get_improvement(
-        fn_new_child, fn_generate_parent, max_age, pool_size, max_seconds
-    ):
-        if timedOut:
-            return improvement
-        display(improvement)
-        if not optimal_fitness > improvement.Fitness:
-            return improvement
+    else:
+        fn_new_child = used_strategies[0]
+
+    return fn_new_child
+
+
+def get_improvements(
+    get_fitness,
+    target_len,
+    gene_set,
+    custom_mutate=None,
+    custom_create=None,
+    max_age=None,
+    pool_size=1,
+    crossover=None,
+    max_seconds=None,
+    islands=None,
+    migration_interval=100,
+    topology=ring_topology,
+    get_fitness_batch=None,
+    batch_size=None,
+    fitness_cache_size=None,
+    compact_genes=False,
+    get_fitness_vectorized=None,
+    get_fitness_delta=None,
+    stats=None,
+    checkpoint_path=None,
+    checkpoint_interval=60,
+    seed=None,
+    max_workers=None,
+    max_evaluations=None,
+    max_generations_without_improvement=None,
+    strategy_selector=None,
+    mutate_in_place=False,
+    deduplicate=False,
+):
+    rng = _get_random(seed)
+    # custom operators that use the module-level random follow the same seed
+    random.seed(rng.getrandbits(64))
+
+    executor = None
+    if max_workers is not None:
+        if get_fitness_batch is not None or get_fitness_vectorized is not None:
+            raise ValueError("max_workers provides its own batch evaluation")
+        if islands is not None:
+            raise ValueError("max_workers is not supported with islands")
+        if fitness_cache_size is not None:
+            # the threads would bypass the cache, which isn't thread-safe
+            raise ValueError("max_workers is not supported with fitness_cache_size")
+        # threads are only started once the first batch is submitted
+        executor = ThreadPoolExecutor(max_workers)
+        get_fitness_batch = _create_threaded_batch(
+            get_fitness, executor, max_workers, stats
+        )
+        if batch_size is None:
+            batch_size = max(pool_size, max_workers)
+
+    if _evaluation_counter is not None:
+        get_fitness = _count_evaluations(get_fitness, _evaluation_counter)
+        get_fitness_batch = _count_evaluations(
+            get_fitness_batch, _evaluation_counter, len
+        )
+        get_fitness_vectorized = _count_evaluations(
+            get_fitness_vectorized, _evaluation_counter, len
+        )
+        get_fitness_delta = _count_evaluations(get_fitness_delta, _evaluation_counter)
+
+    if stats is not None:
+        get_fitness = _time_evaluations(get_fitness, stats)
+        get_fitness_batch = _time_evaluations(get_fitness_batch, stats, len)
+        get_fitness_vectorized = _time_evaluations(get_fitness_vectorized, stats, len)
+        get_fitness_delta = _time_evaluations(get_fitness_delta, stats)
+
+    budgeted = (
+        max_evaluations is not None or max_generations_without_improvement is not None
+    )
+    counter = _EvaluationCounter()
+    get_fitness = _count_evaluations(get_fitness, counter)
+    get_fitness_batch = _count_evaluations(get_fitness_batch, counter, len)
+    get_fitness_vectorized = _count_evaluations(get_fitness_vectorized, counter, len)
+    get_fitness_delta = _count_evaluations(get_fitness_delta, counter)
+    max_stagnant_children = None
+    if max_generations_without_improvement is not None:
+        # a generation is one child per pool slot
+        max_stagnant_children = max_generations_without_improvement * pool_size
+
+    if get_fitness_vectorized is not None:
+        if custom_mutate is not None or custom_create is not None or crossover:
+            raise ValueError(
+                "get_fitness_vectorized requires the built-in create and mutate"
+            )
+        if checkpoint_path is not None:
+            raise ValueError("checkpoint_path is not supported when vectorized")
+        if budgeted:
+            raise ValueError("evaluation budgets are not supported when vectorized")
+        if deduplicate:
+            raise ValueError("deduplicate is not supported when vectorized")
+        if batch_size is None:
+            batch_size = 10 * pool_size
+        if stats is not None:
+            stats.start()
+        try:
+            yield from _get_improvement_events(
+                _get_improvement_vectorized(
+                    get_fitness_vectorized,
+                    target_len,
+                    gene_set,
+                    rng,
+                    max_age,
+                    pool_size,
+                    max_seconds,
+                    max(1, batch_size // pool_size),
+                    stats,
+                ),
+                counter,
+            )
+        finally:
+            if stats is not None:
+                stats.stop()
+        return
+
+    if deduplicate and get_fitness_delta is not None:
+        # delta scoring happens as the child is made, before it can be filtered
+        raise ValueError("deduplicate is not supported with get_fitness_delta")
+    if deduplicate and get_fitness_batch is None:
+        # children must be unscored until the duplicates are dropped
+        def get_fitness_batch(population):
+            return [get_fitness(genes) for genes in population]
+
+        if batch_size is None:
+            batch_size = 1
+
+    if get_fitness_batch is None:
+        get_child_fitness = get_fitness
+        batch_size = 1
+    else:
+        # children are scored together by _get_improvement
+        get_child_fitness = _defer_fitness
+        if get_fitness is None:
+
+            def get_fitness(genes):
+                return get_fitness_batch([genes])[0]
+
+        if batch_size is None:
+            batch_size = max(pool_size, 50)
+
+    if fitness_cache_size is not None:
+        get_fitness = FitnessCache(get_fitness, fitness_cache_size, stats)
+        if get_fitness_batch is None:
+            get_child_fitness = get_fitness
+
+    if mutate_in_place:
+        # children are evaluated on their parent's genes and the edit undone,
+        # so nothing else may see those genes in the meantime
+        if custom_mutate is not None or get_fitness_delta is not None:
+            raise ValueError("mutate_in_place requires the built-in mutate")
+        if get_fitness_batch is not None:
+            raise ValueError("mutate_in_place needs children evaluated at once")
+        if islands is not None and islands > 1:
+            raise ValueError("mutate_in_place is not supported with islands")
+
+    typecode = None
+    if compact_genes and custom_mutate is None and crossover is None:
+        # the engine owns the genes so they can be stored in an array
+        typecode = _get_gene_typecode(gene_set)
+    fn_generate_parent = _create_generate_parent(
+        target_len, gene_set, custom_create, get_fitness, rng, typecode
+    )
+    fn_new_child = _create_new_child(
+        gene_set,
+        custom_mutate,
+        crossover,
+        get_child_fitness,
+        get_fitness_delta,
+        fn_generate_parent,
+        rng,
+        stats,
+        strategy_selector,
+        mutate_in_place,
+    )
+
+    if islands is not None and islands > 1:
+        if checkpoint_path is not None:
+            raise ValueError("checkpoint_path is not supported with islands")
+        if budgeted:
+            raise ValueError("evaluation budgets are not supported with islands")
+        if deduplicate:
+            raise ValueError("deduplicate is not supported with islands")
+        if stats is not None:
+            # the counters would only be updated in the island processes
+            raise ValueError("stats is not supported with islands")
+        yield from _get_improvement_events(
+            _get_improvement_islands(
+                fn_new_child,
+                fn_generate_parent,
+                rng,
+                max_age,
+                pool_size,
+                max_seconds,
+                get_fitness_batch,
+                batch_size,
+                islands,
+                migration_interval,
+                topology,
+                counter,
+                strategy_selector,
+            ),
+            counter,
+        )
+        return
+
+    checkpoint = None
+    if checkpoint_path is not None:
+        checkpoint = _Checkpoint(checkpoint_path, checkpoint_interval)
+    if stats is not None:
+        stats.start()
+    try:
+        yield from _get_improvement_events(
+            _get_improvement(
+                fn_new_child,
+                fn_generate_parent,
+                rng,
+                max_age,
+                pool_size,
+                max_seconds,
+                get_fitness_batch,
+                batch_size,
+                stats,
+                checkpoint,
+                counter,
+                max_evaluations,
+                max_stagnant_children,
+                strategy_selector,
+                deduplicate,
+            ),
+            counter,
+        )
+    finally:
+        if stats is not None:
+            stats.stop()
+        if executor is not None:
+            executor.shutdown()
+    if checkpoint is not None:
+        # a run that stopped on a budget is complete
+        checkpoint.remove()
+
+
+def get_best(
+    get_fitness,
+    target_len,
+    optimal_fitness,
+    gene_set,
+    display,
+    custom_mutate=None,
+    custom_create=None,
+    max_age=None,
+    pool_size=1,
+    crossover=None,
+    max_seconds=None,
+    islands=None,
+    migration_interval=100,
+    topology=ring_topology,
+    get_fitness_batch=None,
+    batch_size=None,
+    fitness_cache_size=None,
+    compact_genes=False,
+    get_fitness_vectorized=None,
+    get_fitness_delta=None,
+    stats=None,
+    checkpoint_path=None,
+    checkpoint_interval=60,
+    seed=None,
+    max_workers=None,
+    max_evaluations=None,
+    max_generations_without_improvement=None,
+    strategy_selector=None,
+    mutate_in_place=False,
+    deduplicate=False,
+    display_rate=None,
+):
+    improvements = get_improvements(
+        get_fitness,
+        target_len,
+        gene_set,
+        custom_mutate,
+        custom_create,
+        max_age,
+        pool_size,
+        crossover,
+        max_seconds,
+        islands,
+        migration_interval,
+        topology,
+        get_fitness_batch,
+        batch_size,
+        fitness_cache_size,
+        compact_genes,
+        get_fitness_vectorized,
+        get_fitness_delta,
+        stats,
+        checkpoint_path,
+        checkpoint_interval,
+        seed,
+        max_workers,
+        max_evaluations,
+        max_generations_without_improvement,
+        strategy_selector,
+        mutate_in_place,
+        deduplicate,
+    )
+    if display_rate is not None:
+        if mutate_in_place:
+            raise ValueError("display_rate would race with mutate_in_place")
+        display = _BackgroundDisplay(display, display_rate)
+    optimal_key = _get_sort_key(optimal_fitness)
+    best = None
+    try:
+        for improvement in improvements:
+            best = improvement.Chromosome
+            if best.StopReason is not None:
+                break
+            display(best)
+            if not optimal_key > best.SortKey:
+                best.StopReason = StopReasons.Optimal
+                break
+    finally:
+        improvements.close()
+        if display_rate is not None:
+            display.close()
+    if checkpoint_path is not None:
+        _Checkpoint(checkpoint_path, checkpoint_interval).remove()
+    return best
+
+
+async def get_improvements_async(
+    get_fitness,
+    target_len,
+    gene_set,
+    custom_mutate=None,
+    custom_create=None,
+    max_age=None,
+    pool_size=1,
+    crossover=None,
+    max_seconds=None,
+    max_in_flight=10,
+    seed=None,
+):
+    rng = _get_random(seed)
+    random.seed(rng.getrandbits(64))
+    start_time = time.time()
+    counter = _EvaluationCounter()
+
+    def create_event(chromosome):
+        # the same events get_improvements yields
+        return Improvement(chromosome, time.time() - start_time, counter.Evaluations)
+
+    async def evaluate(chromosome):
+        counter.Evaluations += 1
+        chromosome.Fitness = await get_fitness(chromosome.Genes)
+        chromosome.SortKey = _get_sort_key(chromosome.Fitness)
+        return chromosome
+
+    fn_generate_parent = _create_generate_parent(
+        target_len, gene_set, custom_create, _defer_fitness, rng, None
+    )
+    regenerated = []
+
+    def fn_generate_donor():
+        # crossover replaces indistinguishable donors, score them before use
+        donor = fn_generate_parent()
+        regenerated.append(donor)
+        return donor
+
+    fn_new_child = _create_new_child(
+        gene_set,
+        custom_mutate,
+        crossover,
+        _defer_fitness,
+        None,
+        fn_generate_donor,
+        rng,
+        None,
+    )
+
+    parents = [fn_generate_parent() for _ in range(pool_size)]
+    await asyncio.gather(*(evaluate(parent) for parent in parents))
+    best_parent = parents[0]
+    yield create_event(best_parent)
+    for parent in parents[1:]:
+        if parent.SortKey > best_parent.SortKey:
+            best_parent = parent
+            yield create_event(best_parent)
+    historical_fitnesses = [best_parent.SortKey]
+
+    last_parent_index = pool_size - 1
+    p_index = 1 % pool_size
+    in_flight = {}
+    try:
+        while True:
+            while len(in_flight) < max_in_flight:
+                p_index = p_index - 1 if p_index > 0 else last_parent_index
+                child = fn_new_child(parents[p_index], p_index, parents)
+                for donor in regenerated:
+                    await evaluate(donor)
+                regenerated.clear()
+                in_flight[asyncio.ensure_future(evaluate(child))] = p_index
+            timeout = None
+            if max_seconds is not None:
+                timeout = max_seconds - (time.time() - start_time)
+            done = set()
+            if timeout is None or timeout > 0:
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+            if len(done) == 0:
+                # like get_improvements, end with the best marked as stopped
+                best_parent.StopReason = StopReasons.MaxSeconds
+                yield create_event(best_parent)
+                return
+            # apply results in the order their children were created
+            for task in [task for task in in_flight if task in done]:
+                index = in_flight.pop(task)
+                child = task.result()
+                if _accept_child(
+                    parents,
+                    index,
+                    child,
+                    best_parent,
+                    historical_fitnesses,
+                    max_age,
+                    rng,
+                    None,
+                ):
+                    best_parent = child
+                    historical_fitnesses.append(child.SortKey)
+                    yield create_event(child)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def get_best_async(
+    get_fitness,
+    target_len,
+    optimal_fitness,
+    gene_set,
+    display,
+    custom_mutate=None,
+    custom_create=None,
+    max_age=None,
+    pool_size=1,
+    crossover=None,
+    max_seconds=None,
+    max_in_flight=10,
+    seed=None,
+):
+    improvements = get_improvements_async(
+        get_fitness,
+        target_len,
+        gene_set,
+        custom_mutate,
+        custom_create,
+        max_age,
+        pool_size,
+        crossover,
+        max_seconds,
+        max_in_flight,
+        seed,
+    )
+    optimal_key = _get_sort_key(optimal_fitness)
+    best = None
+    try:
+        async for improvement in improvements:
+            best = improvement.Chromosome
+            if best.StopReason is not None:
+                break
+            display(best)
+            if not optimal_key > best.SortKey:
+                best.StopReason = StopReasons.Optimal
+                break
+    finally:
+        await improvements.aclose()
+    return best
+
+
+def _run_attempt(optimization_function, feature_value, seed, results):
+    random.seed(seed)
+    try:
+        result = optimization_function(feature_value)
+        # the queue would silently drop a result that can't be pickled
+        pickle.dumps(result)
+    except Exception as error:
+        results.put((None, "{}: {}".format(type(error).__name__, error)))
+        return
+    results.put((result, None))
+
+
+def _race_attempts(optimization_function, feature_value, is_accepted, processes, rng):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_run_attempt,
+            args=(optimization_function, feature_value, seed, results),
+            daemon=True,
+        )
+        for seed in _spawn_seeds(rng, processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        errors = []
+        for reported in range(len(workers)):
+            message = _get_from_workers(results, workers)
+            if message is None:
+                # the remaining workers died without reporting
+                errors.extend(["exited"] * (len(workers) - reported))
+                break
+            result, error = message
+            if error is not None:
+                errors.append(error)
+            elif result is None:
+                errors.append("no result")
+            elif is_accepted(result):
+                return result
+        if len(errors) == len(workers):
+            raise RuntimeError(
+                "every optimization attempt failed: " + "; ".join(sorted(set(errors)))
+            )
+        return None
+    finally:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
 
 
 def hill_climbing(
@@ -175,22 +1324,131 @@ def hill_climbing(
     get_next_feature_value,
     display,
     initial_feature_value,
+    seed=None,
+    processes=None,
 ):
+    rng = _get_random(seed)
+    if seed is not None:
+        # the optimization function and its get_best calls draw from here
+        random.seed(rng.getrandbits(64))
     best = optimization_function(initial_feature_value)
     stdout = sys.stdout
-    sys.stdout = None
-    while not is_optimal(best):
-        feature_value = get_next_feature_value(best)
-        child = optimization_function(feature_value)
-        if is_improvement(best, child):
-            best = child
-            sys.stdout = stdout
-            display(best, feature_value)
-            sys.stdout = None
-    sys.stdout = stdout
+    with contextlib.redirect_stdout(None):
+        while not is_optimal(best):
+            feature_value = get_next_feature_value(best)
+            if processes is None:
+                child = optimization_function(feature_value)
+            else:
+                # attempts at the same value race, the first improvement wins
+                child = _race_attempts(
+                    optimization_function,
+                    feature_value,
+                    partial(is_improvement, best),
+                    processes,
+                    rng,
+                )
+            if child is not None and is_improvement(best, child):
+                best = child
+                with contextlib.redirect_stdout(stdout):
+                    display(best, feature_value)
     return best
 
 
+def round_robin_pairing(player_count, get_standing, rng):
+    yield [(i, j) for i in range(player_count) for j in range(player_count) if i != j]
+
+
+def _pair_both_ways(i, j):
+    # the first player to move has the advantage, so each pairing plays twice
+    return [(i, j), (j, i)]
+
+
+def _take_bye(order, byes):
+    # with an odd count the lowest placed player with the fewest byes sits out
+    if len(order) % 2 == 0:
+        return
+    k = min(range(len(order) - 1, -1, -1), key=lambda k: byes[order[k]])
+    byes[order.pop(k)] += 1
+
+
+def random_pairing(opponents):
+    def fn_pairing(player_count, get_standing, rng):
+        byes = [0] * player_count
+        for _ in range(opponents):
+            order = list(range(player_count))
+            rng.shuffle(order)
+            _take_bye(order, byes)
+            yield [
+                pair
+                for k in range(0, len(order), 2)
+                for pair in _pair_both_ways(order[k], order[k + 1])
+            ]
+
+    return fn_pairing
+
+
+def swiss_pairing(rounds):
+    def fn_pairing(player_count, get_standing, rng):
+        played = set()
+        byes = [0] * player_count
+        for _ in range(rounds):
+            order = list(range(player_count))
+            rng.shuffle(order)
+            order.sort(key=get_standing, reverse=True)
+            _take_bye(order, byes)
+            pairs = []
+            while len(order) > 1:
+                i = order.pop(0)
+                # closest standing not met yet, otherwise a rematch
+                k = next(
+                    (
+                        k
+                        for k, j in enumerate(order)
+                        if (min(i, j), max(i, j)) not in played
+                    ),
+                    0,
+                )
+                j = order.pop(k)
+                played.add((min(i, j), max(i, j)))
+                pairs.extend(_pair_both_ways(i, j))
+            yield pairs
+
+    return fn_pairing
+
+
+def _play_match(pair):
+    players, compete = _tournament_matches
+    return compete(players[pair[0]], players[pair[1]])
+
+
+def _play_matches(players, compete, pairs, processes):
+    global _tournament_matches
+    if processes is None:
+        return [compete(players[i], players[j]) for i, j in pairs]
+    _tournament_matches = players, compete
+    try:
+        with multiprocessing.get_context("fork").Pool(processes) as pool:
+            chunk_size = max(1, len(pairs) // (processes * 4))
+            return pool.map(_play_match, pairs, chunk_size)
+    finally:
+        _tournament_matches = None
+
+
+def _play_cached_matches(players, compete, pairs, processes, match_cache):
+    results = [match_cache.get(players[i], players[j]) for i, j in pairs]
+    unplayed = [k for k, result in enumerate(results) if result is None]
+    start_time = time.perf_counter()
+    played = _play_matches(
+        players, compete, [pairs[k] for k in unplayed], processes
+    )
+    match_cache.PlaySeconds += time.perf_counter() - start_time
+    for k, result in zip(unplayed, played):
+        i, j = pairs[k]
+        match_cache.put(players[i], players[j], result)
+        results[k] = result
+    return results
+
+
 def tournament(
     generate_parent,
     crossover,
@@ -199,7 +1457,15 @@ def tournament(
     sort_key,
     num_parents=10,
     max_generations=100,
+    seed=None,
+    processes=None,
+    match_cache=None,
+    pairing=round_robin_pairing,
 ):
+    rng = _get_random(seed)
+    if seed is not None:
+        # generate_parent and crossover draw from the module-level random
+        random.seed(rng.getrandbits(64))
     pool = [
         [generate_parent(), [0, 0, 0]] for _ in range(1 + num_parents * num_parents)
     ]
@@ -216,15 +1482,25 @@ def tournament(
     generation = 0
     while generation < max_generations:
         generation += 1
-        for i in range(0, len(pool)):
-            for j in range(0, len(pool)):
-                if i == j:
-                    continue
-                player_a, score_a = pool[i]
-                player_b, score_b = pool[j]
-                result = compete(player_a, player_b)
-                score_a[result] += 1
-                score_b[2 - result] += 1
+        players = [x[0] for x in pool]
+        # later rounds see the standings updated by the earlier ones
+        for pairs in pairing(len(pool), lambda i: get_sort_key(pool[i]), rng):
+            if match_cache is None:
+                results = _play_matches(players, compete, pairs, processes)
+            else:
+                results = _play_cached_matches(
+                    players, compete, pairs, processes, match_cache
+                )
+            games = [0] * len(pool)
+            for (i, j), result in zip(pairs, results):
+                pool[i][1][result] += 1
+                pool[j][1][2 - result] += 1
+                games[i] += 1
+                games[j] += 1
+            most = max(games)
+            for i, count in enumerate(games):
+                # byes count as ties so everyone has played as many games
+                pool[i][1][CompetitionResult.Tie] += most - count
 
         pool.sort(key=get_sort_key, reverse=True)
         if get_sort_key(pool[0]) > get_sort_key([best, best_score]):
@@ -261,34 +1537,822 @@ class Strategies(Enum):
     Crossover = 2
 
 
+class StopReasons(Enum):
+    Optimal = 0
+    MaxSeconds = 1
+    MaxEvaluations = 2
+    Stagnation = 3
+
+
 class Chromosome:
-    Genes = None
-    Fitness = None
-    Age = 0
-    Strategy = None
+    __slots__ = ("Genes", "Fitness", "SortKey", "Age", "Strategy", "StopReason")
 
     def __init__(self, genes, fitness, strategy):
         self.Genes = genes
         self.Fitness = fitness
+        self.SortKey = _get_sort_key(fitness)
+        self.Age = 0
         self.Strategy = strategy
+        self.StopReason = None
+
+
+class Improvement:
+    __slots__ = ("Chromosome", "Timestamp", "Elapsed", "Evaluations", "Strategy")
+
+    def __init__(self, chromosome, elapsed, evaluations):
+        self.Chromosome = chromosome
+        self.Timestamp = time.time()
+        self.Elapsed = elapsed
+        self.Evaluations = evaluations
+        self.Strategy = chromosome.Strategy
+
+
+class _PendingChromosome(Chromosome):
+    # a child described by its parent and the genes changed from it
+    __slots__ = ("Parent", "Edits")
+
+    def __init__(self, parent, edits, fitness, strategy):
+        super().__init__(None, fitness, strategy)
+        self.Parent = parent
+        self.Edits = edits
+
+    def materialize(self):
+        genes = self.Parent.Genes[:]
+        for index, gene in self.Edits:
+            genes[index] = gene
+        self.Genes = genes
+        self.Parent = self.Edits = None
+
+
+class _BloomFilter:
+    def __init__(self, capacity, hash_count=4, bits_per_item=16):
+        self._size = capacity * bits_per_item
+        self._bits = bytearray((self._size + 7) // 8)
+        self._hash_count = hash_count
+        self.Capacity = capacity
+        self.Count = 0
+
+    def _positions(self, key):
+        # double hashing from the two halves of one hash
+        value = hash(key) & 0xFFFFFFFFFFFFFFFF
+        first, second = value & 0xFFFFFFFF, (value >> 32) | 1
+        return [(first + i * second) % self._size for i in range(self._hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.Count += 1
+
+    def __contains__(self, key):
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+class _GenomeIndex:
+    # counts the genomes in the pool and remembers recent rejections in two
+    # rotating Bloom filters, so only recent ones are skipped
+    def __init__(self, parents, stats=None, rejection_capacity=1000):
+        self._slots = list(parents)
+        self._counts = {}
+        self._rejection_capacity = rejection_capacity
+        self._rejections = _BloomFilter(rejection_capacity)
+        self._previous_rejections = _BloomFilter(rejection_capacity)
+        self._stats = stats
+        for parent in parents:
+            self._add(parent)
+        self._report()
+
+    @staticmethod
+    def _get_key(genes):
+        try:
+            key = tuple(genes)
+            hash(key)
+        except TypeError:
+            # unhashable genes can't be indexed
+            return None
+        return key
+
+    def _get_slot_key(self, parent):
+        key = self._get_key(parent.Genes)
+        return id(parent.Genes) if key is None else key
+
+    def _add(self, parent):
+        key = self._get_slot_key(parent)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def _remove(self, parent):
+        key = self._get_slot_key(parent)
+        count = self._counts[key] - 1
+        if count == 0:
+            del self._counts[key]
+        else:
+            self._counts[key] = count
+
+    def _report(self):
+        if self._stats is not None:
+            self._stats.Diversity = len(self._counts) / len(self._slots)
+
+    def sync(self, parents):
+        changed = False
+        for index, parent in enumerate(parents):
+            if parent is not self._slots[index]:
+                self._remove(self._slots[index])
+                self._add(parent)
+                self._slots[index] = parent
+                changed = True
+        if changed:
+            self._report()
+
+    def filter(self, children):
+        unique = []
+        seen = set()
+        for index, child in children:
+            key = self._get_key(child.Genes)
+            if key is not None and (
+                key in self._counts
+                or key in seen
+                or key in self._rejections
+                or key in self._previous_rejections
+            ):
+                if self._stats is not None:
+                    self._stats.Duplicates += 1
+                continue
+            seen.add(key)
+            unique.append((index, child))
+        return unique
+
+    def reject(self, child):
+        key = self._get_key(child.Genes)
+        if key is None:
+            return
+        if self._rejections.Count >= self._rejection_capacity:
+            self._previous_rejections = self._rejections
+            self._rejections = _BloomFilter(self._rejection_capacity)
+        self._rejections.add(key)
+
+
+class _ChangeTrackingGenes(list):
+    # records which indexes a custom mutate assigned to, or None once the
+    # length may have changed and only a full evaluation is safe
+    __slots__ = ("ChangedIndexes",)
+
+    def __init__(self, genes):
+        super().__init__(genes)
+        self.ChangedIndexes = set()
+
+    def __setitem__(self, index, value):
+        if self.ChangedIndexes is not None:
+            if isinstance(index, slice):
+                value = list(value)
+                indexes = range(*index.indices(len(self)))
+                if len(indexes) == len(value):
+                    self.ChangedIndexes.update(indexes)
+                else:
+                    self.ChangedIndexes = None
+            else:
+                self.ChangedIndexes.add(index if index >= 0 else len(self) + index)
+        super().__setitem__(index, value)
+
+    def _stop_tracking(self):
+        self.ChangedIndexes = None
+
+    def __delitem__(self, index):
+        self._stop_tracking()
+        super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self._stop_tracking()
+        return super().__iadd__(other)
+
+    def __imul__(self, other):
+        self._stop_tracking()
+        return super().__imul__(other)
+
+    def append(self, value):
+        self._stop_tracking()
+        super().append(value)
+
+    def extend(self, values):
+        self._stop_tracking()
+        super().extend(values)
+
+    def insert(self, index, value):
+        self._stop_tracking()
+        super().insert(index, value)
+
+    def pop(self, index=-1):
+        self._stop_tracking()
+        return super().pop(index)
+
+    def remove(self, value):
+        self._stop_tracking()
+        super().remove(value)
+
+    def clear(self):
+        self._stop_tracking()
+        super().clear()
+
+    def reverse(self):
+        self._stop_tracking()
+        super().reverse()
+
+    def sort(self, *, key=None, reverse=False):
+        self._stop_tracking()
+        super().sort(key=key, reverse=reverse)
+
+
+class _BackgroundDisplay:
+    def __init__(self, display, max_rate):
+        self._display = display
+        self._interval = 1 / max_rate
+        self._condition = threading.Condition()
+        # a one-slot mailbox, newer improvements replace unshown ones
+        self._latest = None
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __call__(self, chromosome):
+        if self._error is not None:
+            raise self._error
+        with self._condition:
+            self._latest = chromosome
+            self._condition.notify()
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._latest is not None or self._closed
+                )
+                chromosome, self._latest = self._latest, None
+                closed = self._closed
+            if chromosome is not None:
+                try:
+                    self._display(chromosome)
+                except Exception as error:
+                    self._error = error
+                    return
+            if closed:
+                return
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed, self._interval)
+
+
+class _Checkpoint:
+    def __init__(self, path, interval):
+        self.Path = path
+        self.Interval = interval
+        self.NextSaveTime = time.time() + interval
+
+    def is_due(self):
+        return time.time() >= self.NextSaveTime
+
+    def load(self):
+        if not os.path.exists(self.Path):
+            return None
+        with open(self.Path, "rb") as infile:
+            return pickle.load(infile)
+
+    def save(self, state):
+        # write a sibling file then rename it so a crash never leaves a torn file
+        temp_path = self.Path + ".tmp"
+        with open(temp_path, "wb") as outfile:
+            pickle.dump(state, outfile, pickle.HIGHEST_PROTOCOL)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(temp_path, self.Path)
+        self.NextSaveTime = time.time() + self.Interval
+
+    def remove(self):
+        if os.path.exists(self.Path):
+            os.remove(self.Path)
+
+
+class FitnessCache:
+    def __init__(self, get_fitness, max_size=10000, stats=None):
+        self._get_fitness = get_fitness
+        self._max_size = max_size
+        self._fitnesses = OrderedDict()
+        self._stats = stats
+        self.Hits = 0
+        self.Misses = 0
+
+    def _miss(self):
+        self.Misses += 1
+        if self._stats is not None:
+            self._stats.CacheMisses += 1
+
+    def __call__(self, genes):
+        try:
+            key = tuple(genes)
+            fitness = self._fitnesses.get(key)
+        except TypeError:
+            # unhashable genes can't be cached
+            self._miss()
+            return self._get_fitness(genes)
+        if fitness is not None:
+            self.Hits += 1
+            if self._stats is not None:
+                self._stats.CacheHits += 1
+            self._fitnesses.move_to_end(key)
+            return fitness
+        self._miss()
+        fitness = self._get_fitness(genes)
+        self._fitnesses[key] = fitness
+        if len(self._fitnesses) > self._max_size:
+            self._fitnesses.popitem(last=False)
+        return fitness
+
+    def __len__(self):
+        return len(self._fitnesses)
+
+    def clear(self):
+        self._fitnesses.clear()
+        self.Hits = 0
+        self.Misses = 0
+
+
+class MatchCache:
+    def __init__(self, max_size=100000):
+        self._max_size = max_size
+        # entries keep their players alive so their ids can't be reused
+        self._results = OrderedDict()
+        self.Hits = 0
+        self.Misses = 0
+        self.PlaySeconds = 0.0
+
+    def get(self, player_a, player_b):
+        key = (id(player_a), id(player_b))
+        entry = self._results.get(key)
+        if entry is None:
+            self.Misses += 1
+            return None
+        self.Hits += 1
+        self._results.move_to_end(key)
+        return entry[2]
+
+    def put(self, player_a, player_b, result):
+        self._results[(id(player_a), id(player_b))] = (player_a, player_b, result)
+        if len(self._results) > self._max_size:
+            self._results.popitem(last=False)
+
+    def hit_rate(self):
+        lookups = self.Hits + self.Misses
+        return self.Hits / lookups if lookups > 0 else 0.0
+
+    def saved_seconds(self):
+        if self.Misses == 0:
+            return 0.0
+        return self.Hits * self.PlaySeconds / self.Misses
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        self._results.clear()
+        self.Hits = 0
+        self.Misses = 0
+        self.PlaySeconds = 0.0
+
+
+class _SuccessWindow:
+    # success rate over the last window trials of one choice
+    __slots__ = ("_outcomes", "_successes")
+
+    def __init__(self, window):
+        self._outcomes = deque(maxlen=window)
+        self._successes = 0
+
+    def add(self, improved):
+        if len(self._outcomes) == self._outcomes.maxlen:
+            self._successes -= self._outcomes[0]
+        self._outcomes.append(improved)
+        self._successes += improved
+
+    def rate(self):
+        # smoothed so untried choices start even
+        return (self._successes + 1) / (len(self._outcomes) + 2)
+
+
+def _get_matching_weights(scores, min_probability):
+    # probability matching with a floor so no choice stops being tried
+    total = sum(scores)
+    spare = max(0, 1 - min_probability * len(scores))
+    return [min_probability + spare * score / total for score in scores]
+
+
+class AdaptiveStrategySelector:
+    # probability matching on each strategy's recent improvements per second
+    # of child creation, with a floor so no strategy stops being tried
+    def __init__(self, window=100, min_probability=0.1):
+        self._window = window
+        self._min_probability = min_probability
+        self._windows = {strategy: _SuccessWindow(window) for strategy in Strategies}
+        self._costs = {}
+        self.Children = {strategy: 0 for strategy in Strategies}
+        self.Improvements = {strategy: 0 for strategy in Strategies}
+
+    def choose(self, strategies, rng):
+        scores = [self.rate(strategy) for strategy in strategies]
+        if all(strategy in self._costs for strategy in strategies):
+            scores = [
+                score / max(self._costs[strategy], 1e-9)
+                for score, strategy in zip(scores, strategies)
+            ]
+        weights = _get_matching_weights(scores, self._min_probability)
+        return rng.choices(strategies, weights)[0]
+
+    def charge(self, strategy, seconds):
+        cost = self._costs.get(strategy)
+        if cost is None:
+            self._costs[strategy] = seconds
+        else:
+            self._costs[strategy] = cost + (seconds - cost) / self._window
+
+    def credit(self, strategy, improved):
+        self._windows[strategy].add(improved)
+        self.Children[strategy] += 1
+        self.Improvements[strategy] += improved
+
+    def rate(self, strategy):
+        return self._windows[strategy].rate()
+
+    def snapshot(self):
+        return {
+            strategy.name: {
+                "children": self.Children[strategy],
+                "improvements": self.Improvements[strategy],
+                "recent_rate": self.rate(strategy),
+                "seconds_per_child": self._costs.get(strategy),
+            }
+            for strategy in Strategies
+            if self.Children[strategy] > 0
+        }
+
+
+def _get_operator_name(operator):
+    # unwrap functools.partial so bound operators keep a readable name
+    operator = getattr(operator, "func", operator)
+    return getattr(operator, "__name__", repr(operator))
+
+
+class MutationScheduler:
+    # applies rounds of mutation operators until the fitness improves, picking
+    # operators by recent success and the round count from recent successes
+    def __init__(
+        self,
+        operators,
+        get_fitness,
+        window=100,
+        min_probability=None,
+        stats=None,
+        rng=None,
+    ):
+        self._operators = list(operators)
+        self._get_fitness = get_fitness
+        if min_probability is None:
+            # successes are rare, so keep half of the choices uniform
+            min_probability = 0.5 / len(self._operators)
+        self._min_probability = min_probability
+        self._stats = stats
+        # the module-level random is seeded by get_best
+        self._rng = random if rng is None else rng
+        self._windows = [_SuccessWindow(window) for _ in self._operators]
+        self.Names = [_get_operator_name(operator) for operator in self._operators]
+        self.Trials = [0] * len(self._operators)
+        self.Improvements = [0] * len(self._operators)
+        self.RoundCounts = deque([1], maxlen=window)
+
+    def __call__(self, genes):
+        initial_fitness = self._get_fitness(genes)
+        count = self._rng.choice(self.RoundCounts)
+        indexes = range(len(self._operators))
+        weights = self._get_weights()
+        used = []
+        for i in range(1, count + 2):
+            index = self._rng.choices(indexes, weights)[0]
+            candidate_weights = weights
+            while not self._operators[index](genes):
+                # an operator that can't change these genes is a failed trial
+                self._credit([index], False)
+                if candidate_weights is weights:
+                    candidate_weights = weights[:]
+                candidate_weights[index] = 0
+                if not any(candidate_weights):
+                    self._credit(used, False)
+                    return
+                index = self._rng.choices(indexes, candidate_weights)[0]
+            used.append(index)
+            if self._get_fitness(genes) > initial_fitness:
+                self.RoundCounts.append(i)
+                self._credit(used, True)
+                return
+        self._credit(used, False)
+
+    def rate(self, index):
+        return self._windows[index].rate()
+
+    def snapshot(self):
+        return {
+            "operators": {
+                name: {
+                    "trials": self.Trials[index],
+                    "improvements": self.Improvements[index],
+                    "recent_rate": self.rate(index),
+                }
+                for index, name in enumerate(self.Names)
+            },
+            "round_counts": list(self.RoundCounts),
+        }
+
+    def _get_weights(self):
+        rates = [window.rate() for window in self._windows]
+        return _get_matching_weights(rates, self._min_probability)
+
+    def _credit(self, used, improved):
+        for index in used:
+            self._windows[index].add(improved)
+            self.Trials[index] += 1
+            self.Improvements[index] += improved
+            if self._stats is not None:
+                counts = self._stats.Operators.setdefault(self.Names[index], [0, 0])
+                counts[0] += 1
+                counts[1] += improved
+
+
+class EngineStats:
+    def __init__(self):
+        self.Children = {strategy: 0 for strategy in Strategies}
+        self.Accepted = 0
+        self.Improvements = 0
+        self.Annealed = 0
+        self.Evaluations = 0
+        self.FitnessSeconds = 0.0
+        self.MutateSeconds = 0.0
+        self.CrossoverSeconds = 0.0
+        self.ParallelWorkers = 0
+        self.ParallelWallSeconds = 0.0
+        self.ParallelWorkSeconds = 0.0
+        self.Operators = {}
+        self.Duplicates = 0
+        self.Diversity = None
+        self.CacheHits = 0
+        self.CacheMisses = 0
+        self.ElapsedSeconds = 0.0
+        self.StartTime = None
+
+    def start(self):
+        if self.StartTime is None:
+            self.StartTime = time.perf_counter()
+
+    def stop(self):
+        # only the time spent running counts when the stats are reused
+        if self.StartTime is not None:
+            self.ElapsedSeconds += time.perf_counter() - self.StartTime
+            self.StartTime = None
+
+    def snapshot(self):
+        elapsed = self.ElapsedSeconds
+        if self.StartTime is not None:
+            elapsed += time.perf_counter() - self.StartTime
+        children = sum(self.Children.values())
+        parallel_efficiency = None
+        if self.ParallelWallSeconds > 0:
+            # busy worker time over the time the workers were available
+            parallel_efficiency = self.ParallelWorkSeconds / (
+                self.ParallelWallSeconds * self.ParallelWorkers
+            )
+        return {
+            "elapsed_seconds": elapsed,
+            "children": {
+                strategy.name: count for strategy, count in self.Children.items()
+            },
+            "accepted": self.Accepted,
+            "rejected": children - self.Accepted,
+            "improvements": self.Improvements,
+            "annealed": self.Annealed,
+            "evaluations": self.Evaluations,
+            "evaluations_per_second": self.Evaluations / elapsed if elapsed > 0 else 0,
+            "fitness_seconds": self.FitnessSeconds,
+            "mutate_seconds": self.MutateSeconds,
+            "crossover_seconds": self.CrossoverSeconds,
+            "engine_seconds": elapsed
+            - self.FitnessSeconds
+            - self.MutateSeconds
+            - self.CrossoverSeconds,
+            "parallel_efficiency": parallel_efficiency,
+            "duplicates_skipped": self.Duplicates,
+            "pool_diversity": self.Diversity,
+            "cache_hits": self.CacheHits,
+            "cache_misses": self.CacheMisses,
+            "operators": {
+                name: {"trials": trials, "improvements": improvements}
+                for name, (trials, improvements) in self.Operators.items()
+            },
+        }
+
+
+class _EvaluationCounter:
+    __slots__ = ("Evaluations",)
+
+    def __init__(self):
+        self.Evaluations = 0
+
+
+def _pin_benchmark_worker(cpus, next_worker):
+    with next_worker.get_lock():
+        index = next_worker.value
+        next_worker.value += 1
+    os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+
+
+def _run_benchmark(seed):
+    random.seed(seed)
+    with open(os.devnull, "w") as devnull:
+        return Benchmark._time(_benchmark_function, devnull)
 
 
 class Benchmark:
     @staticmethod
-    def run(function):
-        timings = []
-        stdout = sys.stdout
-        for i in range(100):
-            sys.stdout = None
-            start_time = time.time()
-            function()
-            seconds = time.time() - start_time
-            sys.stdout = stdout
-            timings.append(seconds)
-            mean = statistics.mean(timings)
-            if i < 10 or i % 10 == 9:
-                print(
-                    "{0} {1:3.2f} {2:3.2f}".format(
-                        1 + i, mean, statistics.stdev(timings, mean) if i > 1 else 0
+    def run(
+        function,
+        iterations=None,
+        warmup=None,
+        name=None,
+        output_path=None,
+        baseline_path=None,
+        regression_threshold=None,
+        processes=None,
+        pin_cpus=None,
+        seed=None,
+    ):
+        # the BENCHMARK_* environment variables configure unchanged callers
+        if iterations is None:
+            iterations = int(os.environ.get("BENCHMARK_ITERATIONS", 100))
+        if warmup is None:
+            warmup = int(os.environ.get("BENCHMARK_WARMUP", 0))
+        if output_path is None:
+            output_path = os.environ.get("BENCHMARK_OUTPUT")
+        if baseline_path is None:
+            baseline_path = os.environ.get("BENCHMARK_BASELINE")
+        if regression_threshold is None:
+            regression_threshold = float(os.environ.get("BENCHMARK_THRESHOLD", 0.1))
+        if processes is None and "BENCHMARK_PROCESSES" in os.environ:
+            processes = int(os.environ["BENCHMARK_PROCESSES"])
+        if pin_cpus is None:
+            pin_cpus = os.environ.get("BENCHMARK_PIN_CPUS", "0") == "1"
+        if name is None:
+            name = getattr(function, "__qualname__", repr(function))
+        if pin_cpus and not hasattr(os, "sched_setaffinity"):
+            raise ValueError("pin_cpus requires os.sched_setaffinity")
+
+        # every run gets its own seed so parallel runs don't repeat each other
+        seeds = _spawn_seeds(_get_random(seed), iterations)
+        with open(os.devnull, "w") as devnull:
+            for _ in range(warmup):
+                with contextlib.redirect_stdout(devnull):
+                    function()
+            if processes is None:
+                runs = Benchmark._run_serial(function, seeds, devnull, pin_cpus)
+            else:
+                runs = Benchmark._run_parallel(function, seeds, processes, pin_cpus)
+            timings = []
+            evaluations = []
+            for i, (nanoseconds, evaluation_count) in enumerate(runs):
+                timings.append(nanoseconds / 1e9)
+                evaluations.append(evaluation_count)
+                mean = statistics.mean(timings)
+                if i < 10 or i % 10 == 9:
+                    print(
+                        "{0} {1:3.2f} {2:3.2f}".format(
+                            1 + i, mean, statistics.stdev(timings, mean) if i > 1 else 0
+                        )
                     )
+
+        result = Benchmark.summarize(name, timings, evaluations)
+        print(
+            "median {0:3.3f}s  p90 {1:3.3f}s  p99 {2:3.3f}s  "
+            "{3:.0f} evaluations/s  {4:.0f} evaluations to solution".format(
+                result["median"],
+                result["p90"],
+                result["p99"],
+                result["evaluations_per_second"],
+                result["evaluations_to_solution"],
+            )
+        )
+        if output_path is not None:
+            Benchmark.save(result, output_path)
+        if baseline_path is not None:
+            Benchmark.compare(result, baseline_path, regression_threshold)
+        return result
+
+    @staticmethod
+    def _run_serial(function, seeds, devnull, pin_cpus):
+        if pin_cpus:
+            cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, {min(cpus)})
+        try:
+            for seed in seeds:
+                random.seed(seed)
+                yield Benchmark._time(function, devnull)
+        finally:
+            if pin_cpus:
+                os.sched_setaffinity(0, cpus)
+
+    @staticmethod
+    def _run_parallel(function, seeds, processes, pin_cpus):
+        global _benchmark_function
+        # fork so the workers can run closures and bound test methods
+        context = multiprocessing.get_context("fork")
+        initializer = None
+        initargs = ()
+        if pin_cpus:
+            initializer = _pin_benchmark_worker
+            initargs = (sorted(os.sched_getaffinity(0)), context.Value("i", 0))
+        _benchmark_function = function
+        try:
+            with context.Pool(processes, initializer, initargs) as pool:
+                yield from pool.imap(_run_benchmark, seeds)
+        finally:
+            _benchmark_function = None
+
+    @staticmethod
+    def _time(function, devnull):
+        global _evaluation_counter
+        counter = _evaluation_counter = _EvaluationCounter()
+        try:
+            with contextlib.redirect_stdout(devnull):
+                start_time = time.perf_counter_ns()
+                function()
+                nanoseconds = time.perf_counter_ns() - start_time
+        finally:
+            _evaluation_counter = None
+        return nanoseconds, counter.Evaluations
+
+    @staticmethod
+    def summarize(name, timings, evaluations):
+        if len(timings) > 1:
+            percentiles = statistics.quantiles(timings, n=100, method="inclusive")
+            p90, p99 = percentiles[89], percentiles[98]
+        else:
+            p90 = p99 = timings[0]
+        total_seconds = sum(timings)
+        return {
+            "name": name,
+            "iterations": len(timings),
+            "mean": statistics.mean(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0,
+            "median": statistics.median(timings),
+            "p90": p90,
+            "p99": p99,
+            "evaluations_per_second": sum(evaluations) / total_seconds
+            if total_seconds > 0
+            else 0,
+            "evaluations_to_solution": statistics.median(evaluations),
+            "timings": timings,
+            "evaluations": evaluations,
+        }
+
+    @staticmethod
+    def save(result, path):
+        results = {}
+        if os.path.exists(path):
+            with open(path) as infile:
+                results = json.load(infile)
+        results[result["name"]] = result
+        temp_path = path + ".tmp"
+        with open(temp_path, "w") as outfile:
+            json.dump(results, outfile, indent=2, sort_keys=True)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def compare(result, baseline_path, regression_threshold):
+        with open(baseline_path) as infile:
+            baseline = json.load(infile).get(result["name"])
+        if baseline is None:
+            print("no baseline for " + result["name"])
+            return
+        limit = baseline["median"] * (1 + regression_threshold)
+        print(
+            "baseline median {0:3.3f}s, limit {1:3.3f}s".format(
+                baseline["median"], limit
+            )
+        )
+        if result["median"] > limit:
+            raise AssertionError(
+                "{0} regressed: median {1:3.3f}s > {2:3.3f}s".format(
+                    result["name"], result["median"], limit
                 )
+            )